@@ -1,6 +1,15 @@
-from .apk_analyzer import analyze_single_apk, process_apk
-from .report_compose import ReportComposer, save_to_json, save_to_csv
-from .interface import APKAnalyzerApp
+import importlib
+
+# Модули загружаются лениво (PEP 562), чтобы импорт пакета не тянул
+# за собой flet и androguard до первого обращения
+_LAZY = {
+    'analyze_single_apk': ('.apk_analyzer', 'analyze_single_apk'),
+    'process_apk': ('.apk_analyzer', 'process_apk'),
+    'ReportComposer': ('.report_compose', 'ReportComposer'),
+    'save_to_json': ('.report_compose', 'save_to_json'),
+    'save_to_csv': ('.report_compose', 'save_to_csv'),
+    'APKAnalyzerApp': ('.interface', 'APKAnalyzerApp'),
+}
 
 __all__ = [
     'analyze_single_apk',
@@ -9,4 +18,17 @@ __all__ = [
     'save_to_json',
     'save_to_csv',
     'APKAnalyzerApp'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module_name, attr = _LAZY[name]
+        obj = getattr(importlib.import_module(module_name, __name__), attr)
+        globals()[name] = obj
+        return obj
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
@@ -1,30 +1,232 @@
+import asyncio
+import collections
+import csv
+import hashlib
+import json
+import logging
+import multiprocessing
 import os
-import sys
+import stat
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from sys import intern
 
-# Добавляем путь для импорта модуля отчетов
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+log = logging.getLogger(__name__)
 
+# Для разрешений и интентов достаточно манифеста, поэтому используем APK
+# без дизассемблирования DEX (AnalyzeAPK строит полный граф XREF)
 try:
-    from androguard.misc import AnalyzeAPK
+    try:
+        from androguard.core.apk import APK
+    except ImportError:
+        from androguard.core.bytecodes.apk import APK
+    try:
+        from androguard.core.axml import AXMLPrinter
+    except ImportError:
+        from androguard.core.bytecodes.axml import AXMLPrinter
     ANDROGUARD_AVAILABLE = True
 except ImportError:
     ANDROGUARD_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Импортируем модуль отчетов
+# Относительный импорт внутри пакета, прямой - при запуске main.py из каталога проекта
 try:
-    from report_compose import ReportComposer, save_to_json, save_to_csv
+    if __package__:
+        from .report_compose import ReportComposer, save_to_json, save_to_csv
+    else:
+        from report_compose import ReportComposer, save_to_json, save_to_csv
     REPORT_COMPOSER_AVAILABLE = True
 except ImportError as e:
-    print(f"Не удалось импортировать модуль отчетов: {e}")
+    log.warning("Не удалось импортировать модуль отчетов: %s", e)
     REPORT_COMPOSER_AVAILABLE = False
 
 
+ANDROID_NS = "{http://schemas.android.com/apk/res/android}"
+
+
+def _intern(value):
+    """Интернирует строку; None и прочие значения возвращает как есть"""
+    return intern(value) if isinstance(value, str) else value
+
+# Кэш результатов анализа по содержимому APK
+_CACHE_DIR = Path.home() / ".cache" / "mobile_guard"
+
+# Версия формата кэша: увеличивать при любом изменении того, что извлекается
+# из APK или как выглядит результат, чтобы старые записи перестали совпадать
+_CACHE_VERSION = 3
+
+# Записи старше этого срока удаляются (один раз за процесс, при первой записи в кэш);
+# сюда же попадают записи прежних версий формата, которые больше не читаются
+_CACHE_MAX_AGE = 30 * 24 * 3600
+_cache_pruned = False
+
+
+def _cache_key(apk_path):
+    """Ключ кэша: версия формата, хэш первого мегабайта, CRC всех записей архива,
+    размер и время изменения
+
+    CRC из центрального каталога zip учитывают изменения в любой части архива
+    (например, замену манифеста или dex в конце файла) без чтения всего APK.
+    Если файл не читается как zip, хэшируется целиком.
+    """
+    st = os.stat(apk_path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{_CACHE_VERSION}:".encode())
+    with open(apk_path, 'rb') as f:
+        h.update(f.read(1 << 20))
+        try:
+            with zipfile.ZipFile(f) as z:
+                for info in z.infolist():
+                    h.update(f"{info.filename}:{info.CRC:08x}:{info.file_size};".encode('utf-8', 'surrogateescape'))
+        except zipfile.BadZipFile:
+            f.seek(0)
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return f"{h.hexdigest()}_{st.st_size}_{int(st.st_mtime)}"
+
+
+def _load_cached(key):
+    """Возвращает (permissions, intents) из кэша или None"""
+    try:
+        with open(_CACHE_DIR / f"{key}.json", 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return [_intern(p) for p in cached['permissions']], cached['intents']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _prune_cache():
+    """Удаляет из кэша записи старше _CACHE_MAX_AGE и брошенные временные файлы"""
+    cutoff = time.time() - _CACHE_MAX_AGE
+    try:
+        with os.scandir(_CACHE_DIR) as it:
+            for entry in it:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def _store_cached(key, permissions, intents):
+    """Сохраняет результат анализа в кэш
+
+    Запись идет во временный файл, который затем атомарно заменяет запись,
+    поэтому сбой или параллельный процесс не оставят обрезанный JSON.
+    """
+    global _cache_pruned
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if not _cache_pruned:
+            _cache_pruned = True
+            _prune_cache()
+        path = _CACHE_DIR / f"{key}.json"
+        tmp_path = _CACHE_DIR / f"{key}.{uuid.uuid4().hex}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump({'permissions': permissions, 'intents': intents}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    except OSError as e:
+        log.warning("Не удалось сохранить кэш анализа: %s", e)
+
+
+def _full_activity_name(package, name):
+    """Приводит имя активности из манифеста к полному имени класса"""
+    if not name or not package:
+        return name
+    if name.startswith('.'):
+        return package + name
+    if '.' not in name:
+        return f"{package}.{name}"
+    return name
+
+
+def _extract_intent_filters(apk_info):
+    """Собирает интент-фильтры всех активностей за один проход по манифесту"""
+    try:
+        root = apk_info.get_android_manifest_xml()
+    except AttributeError:
+        root = None
+
+    if root is None:
+        # Старый путь через API androguard
+        intents = {}
+        for activity in apk_info.get_activities():
+            intents[_intern(activity)] = {
+                'actions': [_intern(a) for a in apk_info.get_intent_filters(activity, 'action') or []],
+                'categories': [_intern(c) for c in apk_info.get_intent_filters(activity, 'category') or []],
+                'data': apk_info.get_intent_filters(activity, 'data') or [],
+            }
+        return intents
+
+    return _intents_from_manifest(root)
+
+
+def _intents_from_manifest(root):
+    """Строит словарь интент-фильтров по дереву AndroidManifest.xml"""
+    package = root.get("package")
+    intents = {}
+    for activity in root.iter("activity"):
+        name = _full_activity_name(package, activity.get(ANDROID_NS + "name"))
+        actions, categories, data = [], [], []
+        for intent_filter in activity.findall("intent-filter"):
+            actions += [_intern(a.get(ANDROID_NS + "name")) for a in intent_filter.findall("action")]
+            categories += [_intern(c.get(ANDROID_NS + "name")) for c in intent_filter.findall("category")]
+            data += [
+                {key.replace(ANDROID_NS, ''): value for key, value in d.attrib.items()}
+                for d in intent_filter.findall("data")
+            ]
+        intents[_intern(name)] = {'actions': actions, 'categories': categories, 'data': data}
+    return intents
+
+
+def analyze_apk_fast(apk_path):
+    """Извлекает разрешения и интенты, читая из архива только манифест
+
+    В отличие от APK() не загружает весь архив и resources.arsc.
+    """
+    with zipfile.ZipFile(apk_path) as z:
+        with z.open("AndroidManifest.xml") as f:
+            axml = AXMLPrinter(f.read())
+
+    root = axml.get_xml_obj()
+    if root is None:
+        raise ValueError("Не удалось разобрать AndroidManifest.xml")
+
+    permissions = [
+        intern(e.get(ANDROID_NS + "name"))
+        for tag in ("uses-permission", "uses-permission-sdk-23")
+        for e in root.iter(tag)
+        if e.get(ANDROID_NS + "name")
+    ]
+    return permissions, _intents_from_manifest(root)
+
+
 def analyze_apk(apk_path):
     """Анализирует APK файл и возвращает разрешения и интенты"""
     if not ANDROGUARD_AVAILABLE:
-        print("Androguard не установлен. Используется демо-режим.")
+        log.warning("Androguard не установлен. Используется демо-режим.")
         # Демо-данные для тестирования
         permissions = [
             "android.permission.INTERNET",
@@ -42,71 +244,146 @@ def analyze_apk(apk_path):
         return permissions, intents
 
     try:
-        apk_info, dex_code, analysis = AnalyzeAPK(apk_path)
-        permissions = apk_info.get_permissions() or []
-        intents = {}
+        key = _cache_key(apk_path)
+        cached = _load_cached(key)
+        if cached is not None:
+            return cached
 
-        for activity in apk_info.get_activities():
-            intent_filters = {
-                'actions': apk_info.get_intent_filters(activity, 'action') or [],
-                'categories': apk_info.get_intent_filters(activity, 'category') or [],
-                'data': apk_info.get_intent_filters(activity, 'data') or [],
-            }
-            intents[activity] = intent_filters
+        try:
+            permissions, intents = analyze_apk_fast(apk_path)
+        except Exception:
+            # Нестандартный архив или манифест - полный разбор через APK
+            apk_info = APK(os.fspath(apk_path))
+            permissions = [_intern(p) for p in apk_info.get_permissions() or []]
+            intents = _extract_intent_filters(apk_info)
 
+        _store_cached(key, permissions, intents)
         return permissions, intents
     except Exception as e:
-        print(f"Ошибка при анализе APK: {e}")
+        log.error("Ошибка при анализе APK: %s", e)
         return [], {}
 
 
 def process_apk(apk_path):
-    """Обрабатывает APK файл и возвращает структурированные данные"""
-    analyzed_data = []
+    """Обрабатывает APK файл и возвращает структурированные данные (или None при ошибке)
+
+    apk_path может быть строкой или Path; имя файла берется из Path.name.
+    """
+    p = apk_path if isinstance(apk_path, Path) else Path(apk_path)
     try:
         permissions, intents = analyze_apk(apk_path)
 
-        analyzed_data.append({
-            'APK': os.path.basename(apk_path),
-            'Path': apk_path,
+        return {
+            'APK': p.name,
+            'Path': os.fspath(apk_path),
             'Permissions': permissions,
             'Intents': intents
-        })
+        }
     except Exception as e:
-        print(f"Ошибка обработки APK {apk_path}: {e}")
+        log.error("Ошибка обработки APK %s: %s", apk_path, e)
 
-    return analyzed_data
+    return None
 
 
-def analyze_single_apk(apk_path, output_dir=None):
-    """Анализирует один APK файл и сохраняет результаты"""
-    if not os.path.exists(apk_path):
-        print(f"Файл не найден: {apk_path}")
-        return None
+def _init_worker(log_queue, log_level):
+    """Инициализирует рабочий процесс: логи уходят в очередь главного процесса"""
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(log_level)
 
-    # Если не указана директория для сохранения, используем текущую
-    if output_dir is None:
-        output_dir = os.path.dirname(apk_path) or "."
 
-    # Анализируем APK
-    data = process_apk(apk_path)
+@contextmanager
+def _make_pool(max_workers=None):
+    """Создает пул процессов для пакетного анализа
+
+    Записи логов из рабочих процессов передаются через очередь и выводятся
+    одним QueueListener в главном процессе, без конкуренции за stdout.
+    """
+    root = logging.getLogger()
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(
+        log_queue,
+        *(root.handlers or [logging.lastResort]),
+        respect_handler_level=True
+    )
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(log_queue, root.level)
+        ) as executor:
+            yield executor
+    finally:
+        listener.stop()
+
+
+def process_apks(paths, max_workers=None):
+    """Обрабатывает несколько APK файлов параллельно в пуле процессов
+
+    Результаты возвращаются в порядке входных путей.
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+
+    with _make_pool(max_workers) as executor:
+        return list(executor.map(process_apk, paths, chunksize=1))
+
+
+def _collect_apk_paths(directory):
+    """Собирает пути ко всем APK файлам в директории"""
+    return sorted(str(p) for p in Path(directory).rglob("*.apk"))
+
+
+def _unique_report_names(paths):
+    """Подбирает имена отчетов так, чтобы APK с одинаковым именем не перезаписывали друг друга
+
+    Для совпадающих имен добавляется короткий хэш полного пути,
+    для повторяющихся путей - номер в пакете.
+    """
+    stems = [Path(path).stem for path in paths]
+    stem_counts = collections.Counter(stems)
+    names = []
+    for stem, path in zip(stems, paths):
+        if stem_counts[stem] > 1:
+            full_path = os.path.abspath(os.fspath(path)).encode('utf-8', 'surrogateescape')
+            stem = f"{stem}_{hashlib.blake2b(full_path, digest_size=4).hexdigest()}"
+        names.append(stem)
+
+    name_counts = collections.Counter(names)
+    return [
+        f"{name}_{i}" if name_counts[name] > 1 else name
+        for i, name in enumerate(names)
+    ]
+
+
+def _save_reports(apk_path, data, output_dir, st=None, report_name=None):
+    """Сохраняет отчеты по результатам анализа одного APK
+
+    st - заранее полученный os.stat_result, чтобы не обращаться к файлу повторно.
+    report_name - базовое имя отчетов (по умолчанию имя APK без расширения).
+    """
+    p = apk_path if isinstance(apk_path, Path) else Path(apk_path)
 
     if data and REPORT_COMPOSER_AVAILABLE:
-        apk_name = os.path.splitext(os.path.basename(apk_path))[0]
+        apk_name = report_name or p.stem
+        if st is None:
+            st = p.stat()
         
         # Создаем компоновщик отчетов
         composer = ReportComposer(output_dir)
         
         # Создаем базовую информацию о APK для отчета
         apk_info = {
-            'name': data[0]['APK'],
-            'path': data[0]['Path'],
-            'size': os.path.getsize(apk_path),
-            'last_modified': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            'name': data['APK'],
+            'path': data['Path'],
+            'size': st.st_size,
+            'last_modified': datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
         }
         
         # Создаем структурированный отчет
-        report = composer.compose_report(apk_info, data[0])
+        report = composer.compose_report(apk_info, data)
         
         # Сохраняем отчет в различных форматах
         saved_files = composer.save_report(
@@ -115,8 +392,8 @@ def analyze_single_apk(apk_path, output_dir=None):
             formats=['json', 'txt', 'csv']
         )
         
-        print(f"Анализ завершен для {apk_path}")
-        print(f"Сохраненные отчеты: {saved_files}")
+        log.info("Анализ завершен для %s", apk_path)
+        log.info("Сохраненные отчеты: %s", saved_files)
         
         return {
             'raw_data': data,
@@ -124,49 +401,121 @@ def analyze_single_apk(apk_path, output_dir=None):
             'saved_files': saved_files
         }
     elif data:
-        apk_name = os.path.splitext(os.path.basename(apk_path))[0]
+        apk_name = report_name or p.stem
         
         # Сохраняем результаты
         csv_path = os.path.join(output_dir, f"{apk_name}_analysis.csv")
         json_path = os.path.join(output_dir, f"{apk_name}_analysis.json")
 
-        save_to_csv(data, csv_path)
-        save_to_json(data, json_path)
+        save_to_csv([data], csv_path)
+        save_to_json([data], json_path)
 
-        print(f"Анализ завершен для {apk_path}")
+        log.info("Анализ завершен для %s", apk_path)
         return data
 
     return None
 
-def save_to_csv_old(data, output_file):
-    if REPORT_COMPOSER_AVAILABLE:
-        return save_to_csv(data, output_file)
-    else:
-        import csv
-        try:
-            with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['APK', 'Permissions', 'Intents']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                for entry in data:
-                    writer.writerow({
-                        'APK': entry['APK'],
-                        'Permissions': ', '.join(entry['Permissions']) if entry['Permissions'] else 'None',
-                        'Intents': str(entry['Intents'])
-                    })
-            print(f"Данные сохранены в {output_file}")
-        except Exception as e:
-            print(f"Ошибка сохранения CSV: {e}")
-
-
-def save_to_json_old(data, output_file):
-    if REPORT_COMPOSER_AVAILABLE:
-        return save_to_json(data, output_file)
-    else:
-        import json
-        try:
+
+async def _analyze_and_save_all(paths, output_dir, max_workers=None):
+    """Конвейер: пока отчеты одного APK пишутся на диск, анализируются следующие"""
+    loop = asyncio.get_running_loop()
+
+    # Имена отчетов выбираются до запуска записи, чтобы параллельные
+    # записи APK с одинаковым именем не попали в один и тот же файл
+    report_names = _unique_report_names(paths)
+
+    with _make_pool(max_workers) as executor:
+        async def one(path, report_name):
+            data = await loop.run_in_executor(executor, process_apk, path)
+            return await asyncio.to_thread(
+                _save_reports, path, data, output_dir, None, report_name
+            )
+
+        return await asyncio.gather(*(one(p, n) for p, n in zip(paths, report_names)))
+
+
+def _analyze_batch(paths, output_dir):
+    """Анализирует набор APK файлов через конвейер _analyze_and_save_all"""
+    if not paths:
+        return []
+    return asyncio.run(_analyze_and_save_all(paths, output_dir))
+
+
+def analyze_single_apk(apk_path, output_dir=None):
+    """Анализирует один APK файл и сохраняет результаты
+
+    Если передан список путей или директория, файлы анализируются
+    параллельно в пуле процессов, запись отчетов идет в фоновых потоках,
+    и возвращается список результатов в порядке входных путей
+    (None на месте отсутствующих файлов).
+    """
+    if isinstance(apk_path, (list, tuple)):
+        results = [None] * len(apk_path)
+        found = []
+        for i, path in enumerate(apk_path):
+            if os.path.exists(path):
+                found.append(i)
+            else:
+                log.error("Файл не найден: %s", path)
+        batch = _analyze_batch([apk_path[i] for i in found], output_dir or ".")
+        for i, result in zip(found, batch):
+            results[i] = result
+        return results
+
+    p = Path(apk_path)
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        log.error("Файл не найден: %s", apk_path)
+        return None
+
+    if stat.S_ISDIR(st.st_mode):
+        return _analyze_batch(_collect_apk_paths(apk_path), output_dir or apk_path)
+
+    # Если не указана директория для сохранения, используем директорию APK
+    if output_dir is None:
+        output_dir = str(p.parent)
+
+    # Анализируем APK
+    data = process_apk(p)
+
+    return _save_reports(p, data, output_dir, st)
+
+def _save_to_csv_fallback(data, output_file):
+    """Сохраняет данные в CSV без модуля отчетов"""
+    try:
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
+            fieldnames = ['APK', 'Permissions', 'Intents']
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(
+                {
+                    'APK': entry['APK'],
+                    'Permissions': ', '.join(entry['Permissions']) if entry['Permissions'] else 'None',
+                    'Intents': str(entry['Intents'])
+                }
+                for entry in data
+            )
+        log.info("Данные сохранены в %s", output_file)
+    except Exception as e:
+        log.error("Ошибка сохранения CSV: %s", e)
+
+
+def _save_to_json_fallback(data, output_file):
+    """Сохраняет данные в JSON без модуля отчетов"""
+    try:
+        if ORJSON_AVAILABLE:
+            with open(output_file, 'wb') as jsonfile:
+                jsonfile.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
             with open(output_file, 'w', encoding='utf-8') as jsonfile:
                 json.dump(data, jsonfile, indent=4, ensure_ascii=False)
-            print(f"Данные сохранены в {output_file}")
-        except Exception as e:
-            print(f"Ошибка сохранения JSON: {e}")
\ No newline at end of file
+        log.info("Данные сохранены в %s", output_file)
+    except Exception as e:
+        log.error("Ошибка сохранения JSON: %s", e)
+
+
+# Реализация сохранения выбирается один раз при импорте
+if not REPORT_COMPOSER_AVAILABLE:
+    save_to_csv = _save_to_csv_fallback
+    save_to_json = _save_to_json_fallback
\ No newline at end of file
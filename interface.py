@@ -2,7 +2,14 @@ import flet as ft
 import os
 import sys
 import json
-from pathlib import Path
+import re
+import time
+import collections
+import functools
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
 
 # Импорт модулей для метрик
@@ -20,6 +27,19 @@ except ImportError as e:
     print(f"Prometheus metrics not available: {e}")
     PROMETHEUS_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Aho-Corasick для поиска подозрительных слов (необязательная зависимость)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Добавляем путь к модулю анализатора
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -39,35 +59,206 @@ except ImportError:
     print("Модуль отчетов не доступен. Используется упрощенный режим.")
 
 
+# Общие неизменяемые стили, создаются один раз на модуль
+_HEADER_PADDING = ft.padding.only(bottom=20)
+_LIST_BORDER = ft.border.all(1, ft.Colors.GREY_300)
+_DELETE_BUTTON_STYLE = ft.ButtonStyle(color=ft.Colors.RED)
+
+# Расширения файлов отчетов
+_REPORT_EXTS = ('.json', '.txt', '.csv', '.html')
+
+# Уровни вредоносности: (текст, цвет, метка для метрик)
+_RISK_HIGH = ("высокая", ft.Colors.RED, 'high')
+_RISK_MEDIUM = ("средняя", ft.Colors.ORANGE, 'medium')
+_RISK_LOW = ("низкая", ft.Colors.GREEN, 'low')
+
+
+def _scandir_apks(root, visited=None):
+    """Рекурсивно обходит директорию через os.scandir и возвращает DirEntry APK файлов.
+
+    Если передан словарь visited, в него записывается mtime каждой обойденной директории.
+    """
+    try:
+        if visited is not None:
+            visited[root] = os.stat(root).st_mtime_ns
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _scandir_apks(entry.path, visited)
+                    elif entry.name.lower().endswith('.apk'):
+                        yield entry
+                except PermissionError:
+                    continue
+    except PermissionError:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def _build_automaton(words):
+    """Строит автомат Aho-Corasick для набора слов (один раз на набор)"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=None)
+def _first_chars(words):
+    """Множество первых букв слов для быстрой предварительной проверки"""
+    return frozenset(word[0] for word in words if word)
+
+
+@functools.lru_cache(maxsize=512)
+def _score_name(name_lower, sus_words):
+    """Считает подозрительные слова в имени (каждое слово учитывается один раз)"""
+    # Если в имени (без расширения .apk, чьи буквы есть в наборе) нет ни одной
+    # первой буквы слов, совпадений быть не может
+    stem = name_lower[:-4] if name_lower.endswith(".apk") else name_lower
+    if _first_chars(sus_words).isdisjoint(stem):
+        return 0
+    automaton = _build_automaton(sus_words)
+    if automaton is not None:
+        return len({word for _, word in automaton.iter(name_lower)})
+    return sum(1 for word in sus_words if word in name_lower)
+
+
+@dataclass(eq=False)
+class ApkInfo:
+    """Описание найденного APK файла"""
+    __slots__ = ("name", "path", "size", "size_str", "path_display", "last_modified", "permissions")
+
+    name: str
+    path: str
+    size: int
+    size_str: str
+    path_display: str
+    last_modified: str
+    permissions: list
+
+
+@functools.lru_cache(maxsize=256)
+def _format_minute(minute):
+    """Форматирует время с точностью до минуты (минута от начала эпохи)"""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(minute * 60))
+
+
+def _make_apk_info(name, path, size, mtime=None):
+    """Создает описание APK файла с заранее отформатированными строками для карточки"""
+    return ApkInfo(
+        name=name,
+        path=path,
+        size=size,
+        size_str=f"{size / 1048576:.2f} MB",
+        path_display=f"Путь: {path[:60]}..." if len(path) > 60 else f"Путь: {path}",
+        # Файлы одной загрузки обычно изменены в одну минуту, строка берется из кэша
+        last_modified=_format_minute(int((time.time() if mtime is None else mtime) // 60)),
+        permissions=[]  # Будет заполнено при анализе
+    )
+
+
+def _dirs_unchanged(visited):
+    """Проверяет, что ни одна из переданных директорий не изменилась (mtime совпадает)"""
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in visited.items())
+    except OSError:
+        return False
+
+
 class APKAnalyzerApp:
+    # Подозрительные слова
+    SUSPICIOUS_WORDS = frozenset({
+        "hack", "crack", "mod", "premium", "free", "cheat",
+        "virus", "trojan", "malware", "spyware", "keylogger",
+        "bot", "exploit", "root", "jailbreak", "adware", "ransomware"
+    })
+
+    # Подозрительные разрешения (в нижнем регистре)
+    DANGEROUS_PERMISSIONS_LOWER = frozenset({
+        "read_sms", "send_sms", "receive_sms", "read_contacts",
+        "write_contacts", "access_fine_location", "access_coarse_location",
+        "record_audio", "camera", "read_call_log", "write_call_log"
+    })
+    # Все опасные разрешения одним регулярным выражением (длинные варианты первыми)
+    DANGEROUS_PERMISSIONS_RE = re.compile(
+        "|".join(re.escape(p) for p in sorted(DANGEROUS_PERMISSIONS_LOWER, key=lambda p: (-len(p), p))),
+        re.IGNORECASE
+    )
+
+    # Максимальное количество APK файлов в списке
+    MAX_APK_FILES = 100
+    # Сколько секунд кэш обхода директории считается свежим (см. _scan_one_directory)
+    DIR_CACHE_TTL = 30.0
+    # Иконки и цвета карточек отчетов по формату
+    _FORMAT_ICONS = {
+        'json': ft.Icons.CODE,
+        'txt': ft.Icons.TEXT_FIELDS,
+        'csv': ft.Icons.TABLE_CHART,
+        'html': ft.Icons.HTML
+    }
+    _FORMAT_COLORS = {
+        'json': ft.Colors.GREEN,
+        'txt': ft.Colors.BLUE,
+        'csv': ft.Colors.ORANGE,
+        'html': ft.Colors.RED
+    }
+
+    # Иконка и цвет диалога сообщений по типу сообщения
+    _MESSAGE_STYLES = {
+        "info": (ft.Icons.INFO, ft.Colors.BLUE),
+        "warning": (ft.Icons.WARNING, ft.Colors.ORANGE),
+        "error": (ft.Icons.ERROR, ft.Colors.RED),
+        "success": (ft.Icons.CHECK_CIRCLE, ft.Colors.GREEN)
+    }
+
+    # Сколько карточек строится за раз при прокрутке списка
+    APK_CARDS_BATCH = 20
+    REPORT_CARDS_BATCH = 20
+
     def __init__(self, page: ft.Page):
         self.page = page
         self.page.title = "Mobile Guard"
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.padding = 10
-        self.page.scroll = ft.ScrollMode.AUTO
 
         # Директории для поиска APK
         self.download_dirs = []
+        # Кэш результатов обхода: директория -> (время обхода, mtime отслеживаемых директорий, список APK)
+        self._dir_cache = {}
+        # Кэш списка отчетов: (mtime обойденных директорий, список отчетов)
+        self._reports_cache = None
+        # Готовые корневые элементы страниц, которые не нужно пересобирать
+        self._page_cache = {}
+
+        # Один диалог сообщений на приложение, перед показом меняется его содержимое;
+        # сообщения, пришедшие пока диалог открыт, ждут своей очереди
+        self._msg_queue = collections.deque()
+        self._msg_icon = ft.Icon(ft.Icons.INFO)
+        self._msg_title = ft.Text("", weight=ft.FontWeight.BOLD)
+        self._msg_body = ft.Text("", size=14)
+        self._msg_dialog = ft.AlertDialog(
+            title=ft.Row([self._msg_icon, self._msg_title]),
+            content=self._msg_body,
+            actions=[
+                ft.TextButton("OK", on_click=self.on_message_ok_click)
+            ],
+            on_dismiss=lambda e: self._show_next_message()
+        )
         self.setup_directories()
 
-        # Подозрительные слова
-        self.SUSPICIOUS_WORDS = [
-            "hack", "crack", "mod", "premium", "free", "cheat",
-            "virus", "trojan", "malware", "spyware", "keylogger",
-            "bot", "exploit", "root", "jailbreak", "adware", "ransomware"
-        ]
-
-        # Подозрительные разрешения
-        self.DANGEROUS_PERMISSIONS = [
-            "READ_SMS", "SEND_SMS", "RECEIVE_SMS", "READ_CONTACTS",
-            "WRITE_CONTACTS", "ACCESS_FINE_LOCATION", "ACCESS_COARSE_LOCATION",
-            "RECORD_AUDIO", "CAMERA", "READ_CALL_LOG", "WRITE_CALL_LOG"
-        ]
-
         # Инициализация UI
         self.init_ui()
 
+    @functools.cached_property
+    def composer(self):
+        """Общий компоновщик отчетов, создается при первом обращении"""
+        return ReportComposer()
+
     def setup_directories(self):
         """Настраивает директории для поиска APK файлов"""
         # Сначала проверяем тестовую папку в проекте
@@ -85,9 +276,15 @@ class APKAnalyzerApp:
             "/storage/self/primary/Download/"
         ]
 
+        # Сначала проверяем корни хранилища: если корня нет, вложенные пути
+        # не проверяем (на обычном компьютере это 2 вызова stat вместо 5)
+        storage_roots = tuple(root for root in ("/sdcard/", "/storage/") if os.path.exists(root))
+
         # Проверяем существующие пути на устройстве
         for path in android_paths:
-            if os.path.exists(path):
+            if not path.startswith(storage_roots):
+                continue
+            if path in storage_roots or os.path.exists(path):
                 self.download_dirs.append(path)
                 print(f"Добавлена Android директории: {path}")
 
@@ -97,46 +294,38 @@ class APKAnalyzerApp:
             os.makedirs(default_dir, exist_ok=True)
             self.download_dirs.append(default_dir)
 
-    def determine_maliciousness(self, apk_name, permissions=None):
-        """Определяет уровень вредоносности на основе имени и разрешений"""
-        apk_name_lower = apk_name.lower()
-        suspicious_count = 0
+    def determine_maliciousness(self, apk_name, permissions=None, stats=None):
+        """Определяет уровень вредоносности на основе имени и разрешений.
+
+        Если передан словарь stats, метрики не отправляются сразу, а
+        накапливаются в нем и отправляются вызывающим кодом одним пакетом.
+        """
         dangerous_count = 0
 
-        # Проверяем подозрительные слова в названии
-        for word in self.SUSPICIOUS_WORDS:
-            if word in apk_name_lower:
-                suspicious_count += 1
+        # Проверяем подозрительные слова в названии (результат кэшируется по имени)
+        suspicious_count = _score_name(apk_name.lower(), self.SUSPICIOUS_WORDS)
 
         # Проверяем опасные разрешения
+        # (каждое опасное разрешение учитывается один раз)
         if permissions:
-            for perm in self.DANGEROUS_PERMISSIONS:
-                if any(perm.lower() in p.lower() for p in permissions):
-                    dangerous_count += 1
-                    suspicious_count += 0.5  # Половина балла за опасное разрешение
+            search = self.DANGEROUS_PERMISSIONS_RE.findall
+            dangerous_count = len({m.lower() for p in permissions for m in search(p)})
+            suspicious_count += 0.5 * dangerous_count  # Половина балла за опасное разрешение
         
-        # Обновляем метрики опасных разрешений
-        if PROMETHEUS_AVAILABLE:
-            update_dangerous_permissions_count(dangerous_count)
-
         if suspicious_count >= 2:
-            risk_level = "высокая"
-            color = ft.Colors.RED
+            risk_level, color, level_key = _RISK_HIGH
         elif suspicious_count >= 1:
-            risk_level = "средняя"
-            color = ft.Colors.ORANGE
+            risk_level, color, level_key = _RISK_MEDIUM
         else:
-            risk_level = "низкая"
-            color = ft.Colors.GREEN
-        
-        # Записываем метрику обнаружения
-        if PROMETHEUS_AVAILABLE:
-            if risk_level == "высокая":
-                record_apk_detection(risk_level='high')
-            elif risk_level == "средняя":
-                record_apk_detection(risk_level='medium')
-            else:
-                record_apk_detection(risk_level='low')
+            risk_level, color, level_key = _RISK_LOW
+
+        # Записываем метрики обнаружения и опасных разрешений
+        if stats is not None:
+            stats[level_key] += 1
+            stats['dangerous'] += dangerous_count
+        elif PROMETHEUS_AVAILABLE:
+            update_dangerous_permissions_count(dangerous_count)
+            record_apk_detection(risk_level=level_key)
 
         return risk_level, color
 
@@ -146,38 +335,77 @@ class APKAnalyzerApp:
     def get_maliciousness_text(self, level, color):
         return ft.Text(f"Вредоносность: {level}", size=12, color=color, weight=ft.FontWeight.BOLD)
 
+    def _scan_one_directory(self, directory):
+        """Собирает информацию об APK файлах одной директории"""
+        # Повторно не обходим, если кэш моложе DIR_CACHE_TTL и не изменились корень
+        # и директории, в которых лежали APK. Проверяются только они, а не все
+        # обойденные директории: на глубоком дереве /sdcard это почти так же дорого,
+        # как сам обход. Цена - новый APK в другой поддиректории или APK, перезаписанный
+        # на месте, появятся в списке только после истечения TTL или по кнопке обновления.
+        cached = self._dir_cache.get(directory)
+        if (cached is not None
+                and time.monotonic() - cached[0] < self.DIR_CACHE_TTL
+                and _dirs_unchanged(cached[1])):
+            return cached[2]
+
+        apk_files = []
+        visited = {}
+        try:
+            if os.path.exists(directory):
+                # Ищем APK файлы
+                for entry in _scandir_apks(directory, visited):
+                    try:
+                        # Один stat на файл: размер и время изменения берутся из него
+                        st = entry.stat(follow_symlinks=True)
+                        # Получаем базовую информацию без полного анализа
+                        apk_info = _make_apk_info(entry.name, entry.path, st.st_size, st.st_mtime)
+                        apk_files.append(apk_info)
+                        # Дальше не обходим: закрытие генератора сворачивает рекурсию
+                        if len(apk_files) >= self.MAX_APK_FILES:
+                            break
+                    except Exception as e:
+                        print(f"Ошибка чтения файла {entry.path}: {e}")
+                        continue
+        except Exception as e:
+            print(f"Ошибка доступа к директории {directory}: {e}")
+            return apk_files
+
+        if visited:
+            watched_dirs = {directory}.union(os.path.dirname(apk.path) for apk in apk_files)
+            watched = {d: visited[d] for d in watched_dirs if d in visited}
+            self._dir_cache[directory] = (time.monotonic(), watched, apk_files)
+        return apk_files
+
+    def invalidate_dir_cache(self, file_path):
+        """Сбрасывает кэш директорий, в которых находится файл"""
+        file_path = os.path.abspath(file_path)
+        for directory in list(self._dir_cache):
+            root = os.path.abspath(directory)
+            if os.path.commonpath([root, file_path]) == root:
+                self._dir_cache.pop(directory, None)
+
     def find_apk_files(self):
         """Находит все APK файлы в указанных директориях"""
         apk_files = []
 
-        for directory in self.download_dirs:
+        # Директории обходятся параллельно в потоках: время уходит на системные
+        # вызовы, во время которых GIL отпускается
+        if self.download_dirs:
+            executor = ThreadPoolExecutor(max_workers=len(self.download_dirs))
             try:
-                path = Path(directory)
-                if path.exists():
-                    # Ищем APK файлы
-                    for apk in path.rglob("*.apk"):
-                        try:
-                            # Получаем базовую информацию без полного анализа
-                            apk_info = {
-                                "name": apk.name,
-                                "path": str(apk),
-                                "size": apk.stat().st_size,
-                                "last_modified": datetime.fromtimestamp(apk.stat().st_mtime).strftime("%Y-%m-%d %H:%M"),
-                                "permissions": []  # Будет заполнено при анализе
-                            }
-                            apk_files.append(apk_info)
-                        except Exception as e:
-                            print(f"Ошибка чтения файла {apk}: {e}")
-                            continue
-            except Exception as e:
-                print(f"Ошибка доступа к директории {directory}: {e}")
-                continue
+                # map сохраняет порядок директорий, поэтому список стабилен
+                for found in executor.map(self._scan_one_directory, self.download_dirs):
+                    apk_files.extend(found[:self.MAX_APK_FILES - len(apk_files)])
+                    if len(apk_files) >= self.MAX_APK_FILES:
+                        break
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
 
         # Если файлов не найдено, создаем демо-файлы
         if not apk_files:
             apk_files = self.create_demo_files()
 
-        return apk_files[:100]  # Ограничиваем 100 файлами
+        return apk_files
 
     def create_demo_files(self):
         """Создает демо-файлы для тестирования"""
@@ -193,20 +421,21 @@ class APKAnalyzerApp:
             {"name": "CrackGameFree.apk", "size": 2500000},
         ]
 
+        # Один проход по директории вместо проверки каждого файла
+        try:
+            with os.scandir(test_dir) as it:
+                existing = {entry.name for entry in it}
+        except OSError:
+            existing = set()
+
         for demo in demos:
             # Создаем пустой файл для демо
             demo_path = os.path.join(test_dir, demo["name"])
-            if not os.path.exists(demo_path):
+            if demo["name"] not in existing:
                 with open(demo_path, 'wb') as f:
                     f.write(b'\x00' * 100)  # Минимальный размер
 
-            demo_info = {
-                "name": demo["name"],
-                "path": demo_path,
-                "size": demo["size"],
-                "last_modified": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                "permissions": []
-            }
+            demo_info = _make_apk_info(demo["name"], demo_path, demo["size"])
             demo_files.append(demo_info)
 
         return demo_files
@@ -214,7 +443,11 @@ class APKAnalyzerApp:
     def init_ui(self):
         """Инициализирует пользовательский интерфейс"""
         # Элементы UI
-        self.apk_list_view = ft.ListView(expand=True, spacing=10)
+        # Списки прокручиваются сами (страница на этих вкладках не прокручивается)
+        self.apk_list_view = ft.ListView(expand=True, spacing=10, on_scroll=self.on_list_scroll)
+        self._apk_files = []
+        self.reports_list_view = ft.ListView(expand=True, spacing=10, on_scroll=self.on_list_scroll)
+        self._reports = []
         self.file_count_text = ft.Text("", size=16)
         self.status_text = ft.Text("", size=14, color=ft.Colors.BLUE)
 
@@ -248,7 +481,19 @@ class APKAnalyzerApp:
     def show_home_page(self):
         """Показывает главную страницу"""
         self.page.controls.clear()
+        self.page.scroll = None
 
+        # Оформление страницы статично, меняется только содержимое списка
+        if 'home' not in self._page_cache:
+            self._page_cache['home'] = self._build_home_page()
+        self.page.add(self._page_cache['home'])
+
+        # Загружаем APK файлы
+        self.load_apk_files()
+        self.page.update()
+
+    def _build_home_page(self):
+        """Собирает корневой элемент главной страницы"""
         # Заголовок
         header = ft.Container(
             content=ft.Column([
@@ -258,7 +503,7 @@ class APKAnalyzerApp:
                 ], alignment=ft.MainAxisAlignment.CENTER),
                 ft.Text("Анализ безопасности Android приложений", size=16, color=ft.Colors.GREY_600),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            padding=ft.padding.only(bottom=20)
+            padding=_HEADER_PADDING
         )
 
         # Кнопка обновления
@@ -280,28 +525,23 @@ class APKAnalyzerApp:
         list_container = ft.Container(
             content=self.apk_list_view,
             expand=True,
-            border=ft.border.all(1, ft.Colors.GREY_300),
+            border=_LIST_BORDER,
             border_radius=10,
             padding=10
         )
 
         # Собираем страницу
-        self.page.add(
-            ft.Column([
-                header,
-                stats_row,
-                self.status_text,
-                list_container
-            ], expand=True, spacing=15)
-        )
-
-        # Загружаем APK файлы
-        self.load_apk_files()
-        self.page.update()
+        return ft.Column([
+            header,
+            stats_row,
+            self.status_text,
+            list_container
+        ], expand=True, spacing=15)
 
     def load_apk_files(self):
         """Загружает и отображает APK файлы"""
         self.apk_list_view.controls.clear()
+        self._apk_files = []
 
         try:
             apk_files = self.find_apk_files()
@@ -320,7 +560,7 @@ class APKAnalyzerApp:
                                 ft.Text("Поместите APK файлы в одну из следующих папок:", size=14),
                                 ft.Column([
                                     ft.Text(f"• {dir}", size=12, color=ft.Colors.GREY)
-                                    for dir in self.download_dirs[:3]
+                                    for dir in itertools.islice(self.download_dirs, 3)
                                 ], spacing=5),
                                 ft.ElevatedButton(
                                     "Создать демо-файлы",
@@ -332,9 +572,9 @@ class APKAnalyzerApp:
                     )
                 )
             else:
-                for i, apk in enumerate(apk_files):
-                    card = self.create_apk_card(apk, i)
-                    self.apk_list_view.controls.append(card)
+                # Карточки строятся порциями, остальные - по мере прокрутки
+                self._apk_files = apk_files
+                self.append_apk_cards()
 
             self.file_count_text.value = f"Найдено APK файлов: {len(apk_files)}"
             self.status_text.value = ""
@@ -345,42 +585,67 @@ class APKAnalyzerApp:
 
         self.page.update()
 
-    def create_apk_card(self, apk_info, index):
-        """Создает карточку для APK файла"""
-        # Форматируем размер
-        size_mb = apk_info["size"] / (1024 * 1024)
-        size_str = f"{size_mb:.2f} MB"
+    def append_apk_cards(self):
+        """Достраивает следующую порцию карточек APK файлов"""
+        start = len(self.apk_list_view.controls)
+        batch = self._apk_files[start:start + self.APK_CARDS_BATCH]
+        if not batch:
+            return False
 
+        stats = {'high': 0, 'medium': 0, 'low': 0, 'dangerous': 0}
+        for apk in batch:
+            card = self.create_apk_card(apk, stats)
+            self.apk_list_view.controls.append(card)
+
+        # Отправляем накопленные метрики одним пакетом
+        if PROMETHEUS_AVAILABLE:
+            for level in ('high', 'medium', 'low'):
+                if stats[level]:
+                    record_apk_detection(risk_level=level, count=stats[level])
+            update_dangerous_permissions_count(stats['dangerous'])
+
+        return True
+
+    def on_list_scroll(self, e):
+        """Подгружает карточки, когда список прокручен почти до конца"""
+        if e.max_scroll_extent is None or e.pixels < e.max_scroll_extent - 200:
+            return
+        if e.control is self.apk_list_view:
+            appended = self.append_apk_cards()
+        else:
+            appended = self.append_report_cards()
+        if appended:
+            e.control.update()
+
+    def create_apk_card(self, apk_info, stats=None):
+        """Создает карточку для APK файла"""
         # Определяем уровень вредоносности
-        maliciousness, color = self.determine_maliciousness(apk_info["name"])
+        maliciousness, color = self.determine_maliciousness(apk_info.name, stats=stats)
 
         # Создаем карточку
+        # apk_info хранится в data элементов, обработчики общие для всех карточек
         card = ft.Card(
             elevation=3,
+            data=apk_info,
             content=ft.Container(
                 content=ft.Column([
                     # Заголовок
                     ft.Row([
                         self.get_android_icon(color),
                         ft.Column([
-                            ft.Text(apk_info["name"],
+                            ft.Text(apk_info.name,
                                     size=16,
                                     weight=ft.FontWeight.BOLD,
                                     overflow=ft.TextOverflow.ELLIPSIS),
-                            ft.Text(apk_info["last_modified"],
+                            ft.Text(apk_info.last_modified,
                                     size=12,
                                     color=ft.Colors.GREY_600),
                         ], expand=True, spacing=0),
-                        ft.Text(size_str, size=14, color=ft.Colors.GREY_600),
+                        ft.Text(apk_info.size_str, size=14, color=ft.Colors.GREY_600),
                     ]),
 
                     # Путь (усеченный)
-                    ft.Text(
-                        f"Путь: {apk_info['path'][:60]}..." if len(
-                            apk_info['path']) > 60 else f"Путь: {apk_info['path']}",
-                        size=12,
-                        color=ft.Colors.GREY
-                    ),
+                    ft.Text(apk_info.path_display, size=12, color=ft.Colors.GREY),
 
                     # Индикатор вредоносности
                     ft.Column([
@@ -395,13 +660,15 @@ class APKAnalyzerApp:
                         ft.ElevatedButton(
                             "Анализировать",
                             icon=ft.Icons.SEARCH,
-                            on_click=lambda e, a=apk_info: self.analyze_apk_file(a),
+                            data=apk_info,
+                            on_click=self.on_analyze_click,
                             width=150
                         ),
                         ft.OutlinedButton(
                             "Информация",
                             icon=ft.Icons.INFO,
-                            on_click=lambda e, a=apk_info: self.show_apk_info(a),
+                            data=apk_info,
+                            on_click=self.on_info_click,
                             width=160
                         ),
                         ft.Container(expand=True),
@@ -409,47 +676,69 @@ class APKAnalyzerApp:
                             icon=ft.Icons.DELETE,
                             icon_color=ft.Colors.RED,
                             tooltip="Удалить файл",
-                            on_click=lambda e, idx=index, apk=apk_info: self.delete_apk_file(idx, apk)
+                            data=apk_info,
+                            on_click=self.on_delete_click
                         )
                     ], spacing=10)
                 ], spacing=10),
                 padding=15,
-                on_click=lambda e, a=apk_info: self.select_apk(a)
+                data=apk_info,
+                on_click=self.on_select_click
             )
         )
 
         return card
 
-    def delete_apk_file(self, index, apk_info):
+    def on_analyze_click(self, e):
+        self.analyze_apk_file(e.control.data)
+
+    def on_info_click(self, e):
+        self.show_apk_info(e.control.data)
+
+    def on_delete_click(self, e):
+        self.delete_apk_file(e.control.data)
+
+    def on_select_click(self, e):
+        self.select_apk(e.control.data)
+
+    def delete_apk_file(self, apk_info):
         """Удаляет APK файл с диска и из списка"""
 
         def confirm_delete(e):
             try:
                 # Удаляем файл с диска
-                file_path = apk_info["path"]
+                file_path = apk_info.path
                 if os.path.exists(file_path):
                     os.remove(file_path)
+                    self.invalidate_dir_cache(file_path)
                     
                     # Обновляем метрики
                     if PROMETHEUS_AVAILABLE:
                         record_file_operation('delete')
                     
-                    # Удаляем из списка
-                    if index < len(self.apk_list_view.controls):
-                        self.apk_list_view.controls.pop(index)
+                    # Удаляем карточку из списка (ищем по data, индексы сдвигаются после удалений)
+                    controls = self.apk_list_view.controls
+                    for i, control in enumerate(controls):
+                        if getattr(control, "data", None) is apk_info:
+                            controls.pop(i)
+                            break
+                    if apk_info in self._apk_files:
+                        self._apk_files.remove(apk_info)
 
                     # Обновляем счетчик
-                    current_count = len(self.apk_list_view.controls)
+                    current_count = len(self._apk_files)
                     self.file_count_text.value = f"Найдено APK файлов: {current_count}"
 
                     self.page.close(dialog)
-                    self.page.update()
+                    # Обновляем только список и счетчик, а не всю страницу
+                    self.apk_list_view.update()
+                    self.file_count_text.update()
 
                     # Показываем сообщение об успехе
-                    self.show_message_dialog("Успех", f"Файл удален: {apk_info['name']}", "info")
+                    self.show_message_dialog("Успех", f"Файл удален: {apk_info.name}", "info")
                 else:
                     self.page.close(dialog)
-                    self.show_message_dialog("Ошибка", f"Файл не найден: {apk_info['name']}", "warning")
+                    self.show_message_dialog("Ошибка", f"Файл не найден: {apk_info.name}", "warning")
 
             except Exception as ex:
                 self.page.close(dialog)
@@ -463,13 +752,13 @@ class APKAnalyzerApp:
             title=ft.Text("Подтверждение удаления", weight=ft.FontWeight.BOLD),
             content=ft.Column([
                 ft.Text(f"Вы действительно хотите удалить файл?", size=14),
-                ft.Text(f"'{apk_info['name']}'", size=16, weight=ft.FontWeight.BOLD, color=ft.Colors.RED),
-                ft.Text(f"Путь: {apk_info['path']}", size=12, color=ft.Colors.GREY_600),
+                ft.Text(f"'{apk_info.name}'", size=16, weight=ft.FontWeight.BOLD, color=ft.Colors.RED),
+                ft.Text(f"Путь: {apk_info.path}", size=12, color=ft.Colors.GREY_600),
                 ft.Text("Это действие невозможно отменить!", size=12, color=ft.Colors.RED, italic=True)
             ], tight=True, spacing=10),
             actions=[
                 ft.TextButton("Отмена", on_click=cancel_delete),
-                ft.TextButton("Удалить", on_click=confirm_delete, style=ft.ButtonStyle(color=ft.Colors.RED))
+                ft.TextButton("Удалить", on_click=confirm_delete, style=_DELETE_BUTTON_STYLE)
             ],
             actions_alignment=ft.MainAxisAlignment.END
         )
@@ -478,7 +767,7 @@ class APKAnalyzerApp:
 
     def analyze_apk_file(self, apk_info):
         """Запускает анализ APK файла"""
-        self.status_text.value = f"Анализирую {apk_info['name']}..."
+        self.status_text.value = f"Анализирую {apk_info.name}..."
         self.status_text.color = ft.Colors.BLUE
         self.page.update()
 
@@ -490,7 +779,7 @@ class APKAnalyzerApp:
                 
                 # Вызываем функцию анализа из модуля apk_analyzer
                 results = analyze_single_apk(
-                    apk_info['path'],
+                    apk_info.path,
                     output_dir=os.path.join(os.path.dirname(__file__), "analysis_results")
                 )
 
@@ -505,7 +794,7 @@ class APKAnalyzerApp:
                     if PROMETHEUS_AVAILABLE:
                         record_apk_analysis(status='error')
                     
-                    self.status_text.value = f"Не удалось проанализировать {apk_info['name']}"
+                    self.status_text.value = f"Не удалось проанализировать {apk_info.name}"
                     self.status_text.color = ft.Colors.RED
             else:
                 # Демо-режим
@@ -533,12 +822,12 @@ class APKAnalyzerApp:
             
             # Используем ReportComposer для предпросмотра
             if REPORT_COMPOSER_AVAILABLE:
-                composer = ReportComposer()
+                composer = self.composer
                 preview_column = composer.get_report_preview(structured_report)
             else:
                 # Упрощенный предпросмотр
                 maliciousness, color = self.determine_maliciousness(
-                    apk_info['name'], 
+                    apk_info.name, 
                     permissions
                 )
                 preview_column = ft.Column([
@@ -554,7 +843,7 @@ class APKAnalyzerApp:
             saved_files = {}
             
             # Определяем уровень вредоносности
-            maliciousness, color = self.determine_maliciousness(apk_info['name'], permissions)
+            maliciousness, color = self.determine_maliciousness(apk_info.name, permissions)
             preview_column = ft.Column([
                 ft.Row([
                     self.get_android_icon(color),
@@ -563,15 +852,17 @@ class APKAnalyzerApp:
                 ft.Text(f"Разрешений: {len(permissions)}", size=14),
             ])
 
+        total_permissions = len(permissions)
+
         # Создаем список разрешений
         permissions_list = ft.Column([
-            ft.Text(f"{i + 1}. {perm}", size=14)
-            for i, perm in enumerate(permissions[:15])  # Показываем первые 15
+            ft.Text(f"{i}. {perm}", size=14)
+            for i, perm in itertools.islice(enumerate(permissions, 1), 15)  # Показываем первые 15
         ], scroll=ft.ScrollMode.AUTO, height=200)
 
-        if len(permissions) > 15:
+        if total_permissions > 15:
             permissions_list.controls.append(
-                ft.Text(f"... и еще {len(permissions) - 15} разрешений",
+                ft.Text(f"... и еще {total_permissions - 15} разрешений",
                         size=12, color=ft.Colors.GREY)
             )
 
@@ -581,7 +872,7 @@ class APKAnalyzerApp:
             ft.Divider(),
             ft.Text("Разрешения:", size=16, weight=ft.FontWeight.BOLD),
             permissions_list,
-            ft.Text(f"Всего разрешений: {len(permissions)}", size=14),
+            ft.Text(f"Всего разрешений: {total_permissions}", size=14),
         ]
         
         # Добавляем информацию о сохраненных файлах
@@ -602,13 +893,13 @@ class APKAnalyzerApp:
         ]
 
         dialog = ft.AlertDialog(
-            title=ft.Text(f"Результаты анализа: {apk_info['name']}"),
+            title=ft.Text(f"Результаты анализа: {apk_info.name}"),
             content=ft.Column(dialog_content, tight=True, spacing=10),
             actions=actions
         )
 
         self.page.open(dialog)
-        self.status_text.value = f"Анализ завершен для {apk_info['name']}"
+        self.status_text.value = f"Анализ завершен для {apk_info.name}"
         self.status_text.color = ft.Colors.GREEN
         self.page.update()
 
@@ -616,8 +907,8 @@ class APKAnalyzerApp:
         """Сохраняет полный отчет с использованием ReportComposer"""
         try:
             if REPORT_COMPOSER_AVAILABLE:
-                # Создаем компоновщик отчетов
-                composer = ReportComposer()
+                # Общий компоновщик отчетов
+                composer = self.composer
                 
                 # Подготавливаем данные
                 if isinstance(analysis_data, dict) and 'structured_report' in analysis_data:
@@ -625,17 +916,18 @@ class APKAnalyzerApp:
                 else:
                     # Создаем новый отчет из старых данных
                     report = composer.compose_report(
-                        apk_info,
+                        asdict(apk_info),
                         analysis_data[0] if isinstance(analysis_data, list) else analysis_data
                     )
                 
                 # Сохраняем отчет
-                apk_name = os.path.splitext(apk_info['name'])[0]
+                apk_name = os.path.splitext(apk_info.name)[0]
                 saved_files = composer.save_report(
                     report=report,
                     apk_name=apk_name,
                     formats=['json', 'txt', 'csv', 'html']
                 )
+                self._reports_cache = None
                 
                 # Записываем метрики генерации отчетов
                 if PROMETHEUS_AVAILABLE:
@@ -722,10 +1014,14 @@ class APKAnalyzerApp:
 
             # Сохраняем в JSON
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_file = os.path.join(reports_dir, f"{apk_info['name']}_{timestamp}.json")
+            report_file = os.path.join(reports_dir, f"{apk_info.name}_{timestamp}.json")
 
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(analysis_data, f, indent=4, ensure_ascii=False)
+            if ORJSON_AVAILABLE:
+                with open(report_file, 'wb') as f:
+                    f.write(orjson.dumps(analysis_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    json.dump(analysis_data, f, indent=4, ensure_ascii=False)
 
             self.show_message_dialog("Успех", f"Отчет сохранен:\n{report_file}", "info")
 
@@ -742,10 +1038,10 @@ class APKAnalyzerApp:
         ]
 
         # Определяем уровень вредоносности
-        maliciousness, color = self.determine_maliciousness(apk_info['name'], demo_permissions)
+        maliciousness, color = self.determine_maliciousness(apk_info.name, demo_permissions)
 
         dialog = ft.AlertDialog(
-            title=ft.Text(f"Демо-анализ: {apk_info['name']}"),
+            title=ft.Text(f"Демо-анализ: {apk_info.name}"),
             content=ft.Column([
                 ft.Text("Внимание: Androguard не установлен!",
                         size=14, color=ft.Colors.RED, weight=ft.FontWeight.BOLD),
@@ -770,13 +1066,14 @@ class APKAnalyzerApp:
         )
 
         self.page.open(dialog)
-        self.status_text.value = f"Демо-анализ завершен для {apk_info['name']}"
+        self.status_text.value = f"Демо-анализ завершен для {apk_info.name}"
         self.status_text.color = ft.Colors.ORANGE
         self.page.update()
 
     def show_reports_page(self):
         """Показывает страницу с отчетами"""
         self.page.controls.clear()
+        self.page.scroll = None
 
         # Заголовок
         header = ft.Container(
@@ -787,7 +1084,7 @@ class APKAnalyzerApp:
                 ], alignment=ft.MainAxisAlignment.CENTER),
                 ft.Text("Просмотр сохраненных отчетов", size=16, color=ft.Colors.GREY_600),
             ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            padding=ft.padding.only(bottom=20)
+            padding=_HEADER_PADDING
         )
 
         # Поиск отчетов
@@ -809,11 +1106,10 @@ class APKAnalyzerApp:
                 )
             ], expand=True, spacing=20)
         else:
-            # Список отчетов
-            reports_list = ft.ListView(expand=True, spacing=10)
-            
-            for report in reports:
-                reports_list.controls.append(self.create_report_card(report))
+            # Список отчетов: карточки строятся порциями, остальные - по мере прокрутки
+            self.reports_list_view.controls.clear()
+            self._reports = reports
+            self.append_report_cards()
             
             content = ft.Column([
                 header,
@@ -825,9 +1121,9 @@ class APKAnalyzerApp:
                     width=200
                 ),
                 ft.Container(
-                    content=reports_list,
+                    content=self.reports_list_view,
                     expand=True,
-                    border=ft.border.all(1, ft.Colors.GREY_300),
+                    border=_LIST_BORDER,
                     border_radius=10,
                     padding=10
                 ),
@@ -836,33 +1132,63 @@ class APKAnalyzerApp:
         self.page.add(content)
         self.page.update()
 
+    def append_report_cards(self):
+        """Достраивает следующую порцию карточек отчетов"""
+        controls = self.reports_list_view.controls
+        start = len(controls)
+        batch = self._reports[start:start + self.REPORT_CARDS_BATCH]
+        controls.extend(self.create_report_card(report) for report in batch)
+        return bool(batch)
+
     def find_reports(self):
         """Находит все сохраненные отчеты"""
         reports_dir = os.path.join(os.path.dirname(__file__), "analysis_reports")
         
         if not os.path.exists(reports_dir):
             return []
+
+        # Если ни одна директория отчетов не изменилась, повторно не обходим
+        if self._reports_cache is not None and _dirs_unchanged(self._reports_cache[0]):
+            return self._reports_cache[1]
             
         report_files = []
-        
-        for ext in ['.json', '.txt', '.csv', '.html']:
-            for report_file in Path(reports_dir).rglob(f"*{ext}"):
-                try:
-                    report_info = {
-                        "name": report_file.name,
-                        "path": str(report_file),
-                        "size": report_file.stat().st_size,
-                        "modified": datetime.fromtimestamp(report_file.stat().st_mtime).strftime("%Y-%m-%d %H:%M"),
-                        "format": ext[1:]  # Без точки
-                    }
-                    report_files.append(report_info)
-                except Exception as e:
-                    print(f"Ошибка чтения отчета {report_file}: {e}")
-                    continue
-                    
-        # Сортируем по дате изменения (новые сначала)
-        report_files.sort(key=lambda x: x['modified'], reverse=True)
-        return report_files[:50]  # Ограничиваем 50 отчетами
+        visited = {}
+
+        # Один обход дерева вместо отдельного rglob на каждое расширение
+        # и один stat на файл (размер и время берутся из одного результата)
+        stack = [reports_dir]
+        while stack:
+            directory = stack.pop()
+            try:
+                visited[directory] = os.stat(directory).st_mtime_ns
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.name.endswith(_REPORT_EXTS):
+                                continue
+                            st = entry.stat()
+                            report_files.append({
+                                "name": entry.name,
+                                "path": entry.path,
+                                "size": st.st_size,
+                                "mtime": st.st_mtime,
+                                "format": entry.name.rsplit('.', 1)[-1]  # Без точки
+                            })
+                        except OSError as e:
+                            print(f"Ошибка чтения отчета {entry.path}: {e}")
+                            continue
+            except OSError as e:
+                print(f"Ошибка доступа к директории {directory}: {e}")
+                continue
+
+        # 50 самых новых отчетов, новые сначала (без полной сортировки)
+        report_files = heapq.nlargest(50, report_files, key=lambda x: x['mtime'])
+
+        self._reports_cache = (visited, report_files)
+        return report_files
 
     def create_report_card(self, report_info):
         """Создает карточку для отчета"""
@@ -870,23 +1196,9 @@ class APKAnalyzerApp:
         size_kb = report_info["size"] / 1024
         size_str = f"{size_kb:.1f} KB"
         
-        # Иконка в зависимости от формата
-        format_icons = {
-            'json': ft.Icons.CODE,
-            'txt': ft.Icons.TEXT_FIELDS,
-            'csv': ft.Icons.TABLE_CHART,
-            'html': ft.Icons.HTML
-        }
-        icon = format_icons.get(report_info['format'], ft.Icons.INSERT_DRIVE_FILE)
-        
-        # Цвет в зависимости от формата
-        format_colors = {
-            'json': ft.Colors.GREEN,
-            'txt': ft.Colors.BLUE,
-            'csv': ft.Colors.ORANGE,
-            'html': ft.Colors.RED
-        }
-        color = format_colors.get(report_info['format'], ft.Colors.GREY)
+        # Иконка и цвет в зависимости от формата
+        icon = self._FORMAT_ICONS.get(report_info['format'], ft.Icons.INSERT_DRIVE_FILE)
+        color = self._FORMAT_COLORS.get(report_info['format'], ft.Colors.GREY)
 
         card = ft.Card(
             elevation=2,
@@ -907,25 +1219,28 @@ class APKAnalyzerApp:
                     ]),
                     
                     # Информация
-                    ft.Text(f"Изменен: {report_info['modified']}", size=12, color=ft.Colors.GREY),
+                    # Дата форматируется только для построенных карточек
+                    ft.Text(f"Изменен: {_format_minute(int(report_info['mtime'] // 60))}",
+                            size=12, color=ft.Colors.GREY),
                     
                     # Кнопки действий
                     ft.Row([
                         ft.OutlinedButton(
                             "Просмотреть",
                             icon=ft.Icons.VISIBILITY,
-                            on_click=lambda e, r=report_info: self.view_report(r),
+                            data=report_info,
+                            on_click=self.on_view_report_click,
                             width=160
                         ),
                         ft.OutlinedButton(
                             "Удалить",
                             icon=ft.Icons.DELETE,
                             icon_color=ft.Colors.RED,
-                            on_click=lambda e, r=report_info: self.delete_report(r),
+                            data=report_info,
+                            on_click=self.on_delete_report_click,
                             width=160
                         ),
-                        ft.Container(expand=True),
-                    ], spacing=5)
+                    ], alignment=ft.MainAxisAlignment.START, spacing=5)
                 ], spacing=10),
                 padding=15
             )
@@ -933,6 +1248,12 @@ class APKAnalyzerApp:
         
         return card
 
+    def on_view_report_click(self, e):
+        self.view_report(e.control.data)
+
+    def on_delete_report_click(self, e):
+        self.delete_report(e.control.data)
+
     def view_report(self, report_info):
         """Просматривает отчет"""
         self.show_file_content_dialog(report_info['path'])
@@ -942,22 +1263,23 @@ class APKAnalyzerApp:
 
         def confirm_delete(e):
             try:
-                file_path = report_info["path"]
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    
-                    # Обновляем метрики
-                    if PROMETHEUS_AVAILABLE:
-                        record_file_operation('report_delete')
-                    
-                    # Обновляем страницу отчетов
-                    self.page.close(dialog)
-                    self.show_reports_page()
-                    
-                    self.show_message_dialog("Успех", f"Отчет удален: {report_info['name']}", "info")
-                else:
+                try:
+                    os.remove(report_info["path"])
+                except FileNotFoundError:
                     self.page.close(dialog)
                     self.show_message_dialog("Ошибка", "Файл не найден", "warning")
+                    return
+                self._reports_cache = None
+                
+                # Обновляем метрики
+                if PROMETHEUS_AVAILABLE:
+                    record_file_operation('report_delete')
+                
+                # Обновляем страницу отчетов
+                self.page.close(dialog)
+                self.show_reports_page()
+                
+                self.show_message_dialog("Успех", f"Отчет удален: {report_info['name']}", "info")
                     
             except Exception as ex:
                 self.page.close(dialog)
@@ -976,7 +1298,7 @@ class APKAnalyzerApp:
             ], tight=True, spacing=10),
             actions=[
                 ft.TextButton("Отмена", on_click=cancel_delete),
-                ft.TextButton("Удалить", on_click=confirm_delete, style=ft.ButtonStyle(color=ft.Colors.RED))
+                ft.TextButton("Удалить", on_click=confirm_delete, style=_DELETE_BUTTON_STYLE)
             ]
         )
         self.page.open(dialog)
@@ -988,13 +1310,15 @@ class APKAnalyzerApp:
             file_ext = os.path.splitext(file_name)[1].lower()
             
             if file_ext in ['.txt', '.json', '.csv']:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # Ограничиваем длину для больших файлов
+                # Ограничиваем длину для больших файлов: читаем только то, что покажем,
+                # и один лишний символ, чтобы понять, есть ли продолжение
                 max_chars = 5000
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read(max_chars + 1)
+
                 if len(content) > max_chars:
-                    display_content = content[:max_chars] + f"\n\n... (файл слишком большой, показаны первые {max_chars} символов из {len(content)})"
+                    file_size = os.path.getsize(file_path)
+                    display_content = content[:max_chars] + f"\n\n... (файл слишком большой, показаны первые {max_chars} символов, размер файла {file_size} байт)"
                     show_full = True
                 else:
                     display_content = content
@@ -1026,9 +1350,6 @@ class APKAnalyzerApp:
                 self.page.open(dialog)
                 
             elif file_ext == '.html':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
                 # Для HTML файлов показываем информацию о файле
                 dialog = ft.AlertDialog(
                     title=ft.Text(f"HTML отчет: {file_name}"),
@@ -1057,8 +1378,17 @@ class APKAnalyzerApp:
     def show_full_file_content(self, file_path):
         """Показывает полное содержимое файла"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Даже полный просмотр ограничен, чтобы огромный файл не занял всю память
+            max_chars = 2 * 1024 * 1024
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read(max_chars + 1)
+
+            if len(content) > max_chars:
+                content = content[:max_chars]
+                size_text = (f"Показаны первые {max_chars} символов, "
+                             f"размер файла {os.path.getsize(file_path)} байт")
+            else:
+                size_text = f"Размер файла: {len(content)} символов"
                 
             file_name = os.path.basename(file_path)
             file_ext = os.path.splitext(file_name)[1].lower()
@@ -1068,7 +1398,7 @@ class APKAnalyzerApp:
                 title=ft.Text(f"Полное содержимое: {file_name}"),
                 content=ft.Container(
                     content=ft.Column([
-                        ft.Text(f"Размер файла: {len(content)} символов", size=12, color=ft.Colors.GREY),
+                        ft.Text(size_text, size=12, color=ft.Colors.GREY),
                         ft.Divider(),
                         ft.Text(content, 
                                size=10,  # Уменьшаем размер шрифта для больших файлов
@@ -1088,39 +1418,39 @@ class APKAnalyzerApp:
             self.show_message_dialog("Ошибка", f"Не удалось прочитать файл: {str(e)}", "error")
 
     def show_message_dialog(self, title, message, message_type="info"):
-        """Показывает диалоговое окно с сообщением"""
-        colors = {
-            "info": ft.Colors.BLUE,
-            "warning": ft.Colors.ORANGE,
-            "error": ft.Colors.RED,
-            "success": ft.Colors.GREEN
-        }
-        
-        icons = {
-            "info": ft.Icons.INFO,
-            "warning": ft.Icons.WARNING,
-            "error": ft.Icons.ERROR,
-            "success": ft.Icons.CHECK_CIRCLE
-        }
-        
-        color = colors.get(message_type, ft.Colors.BLUE)
-        icon = icons.get(message_type, ft.Icons.INFO)
-        
-        dialog = ft.AlertDialog(
-            title=ft.Row([
-                ft.Icon(icon, color=color),
-                ft.Text(title, weight=ft.FontWeight.BOLD),
-            ]),
-            content=ft.Text(message, size=14),
-            actions=[
-                ft.TextButton("OK", on_click=lambda e: self.page.close(dialog))
-            ]
-        )
-        self.page.open(dialog)
+        """Показывает диалоговое окно с сообщением
+
+        Если открыто предыдущее сообщение, новое показывается после его закрытия.
+        """
+        self._msg_queue.append((title, message, message_type))
+        self._show_next_message()
+
+    def _show_next_message(self):
+        """Показывает следующее сообщение из очереди, если диалог закрыт"""
+        if self._msg_dialog.open or not self._msg_queue:
+            return
+        title, message, message_type = self._msg_queue.popleft()
+        icon, color = self._MESSAGE_STYLES.get(message_type, self._MESSAGE_STYLES["info"])
+
+        self._msg_icon.name = icon
+        self._msg_icon.color = color
+        self._msg_title.value = title
+        self._msg_body.value = message
+        self.page.open(self._msg_dialog)
+
+    def on_message_ok_click(self, e):
+        """Закрывает сообщение и показывает следующее из очереди"""
+        self.page.close(self._msg_dialog)
+        self._show_next_message()
 
     def install_androguard(self):
         """Показывает инструкцию по установке Androguard"""
-        dialog = ft.AlertDialog(
+        self.page.open(self._androguard_dialog)
+
+    @functools.cached_property
+    def _androguard_dialog(self):
+        """Статичный диалог с инструкцией, создается при первом показе"""
+        return ft.AlertDialog(
             title=ft.Text("Установка Androguard"),
             content=ft.Column([
                 ft.Text("Для полноценного анализа установите Androguard:", size=14),
@@ -1140,10 +1470,9 @@ class APKAnalyzerApp:
                 ft.Text("После установки перезапустите приложение", size=12, color=ft.Colors.BLUE)
             ], tight=True, spacing=10),
             actions=[
-                ft.TextButton("Закрыть", on_click=lambda e: self.page.close(dialog))
+                ft.TextButton("Закрыть", on_click=lambda e: self.page.close(self._androguard_dialog))
             ]
         )
-        self.page.open(dialog)
 
     def show_apk_info(self, apk_info):
         """Показывает информацию о APK файле"""
@@ -1152,12 +1481,12 @@ class APKAnalyzerApp:
             content=ft.Column([
                 ft.Row([
                     self.get_android_icon(ft.Colors.BLUE),
-                    ft.Text(apk_info["name"], weight=ft.FontWeight.BOLD, size=18),
+                    ft.Text(apk_info.name, weight=ft.FontWeight.BOLD, size=18),
                 ], spacing=10),
                 ft.Divider(),
-                ft.Text(f"Путь: {apk_info['path']}", size=14),
-                ft.Text(f"Размер: {apk_info['size'] / (1024 * 1024):.2f} MB", size=14),
-                ft.Text(f"Изменен: {apk_info['last_modified']}", size=14),
+                ft.Text(f"Путь: {apk_info.path}", size=14),
+                ft.Text(f"Размер: {apk_info.size_str}", size=14),
+                ft.Text(f"Изменен: {apk_info.last_modified}", size=14),
             ], tight=True, spacing=10),
             actions=[
                 ft.TextButton("Анализировать",
@@ -1174,6 +1503,8 @@ class APKAnalyzerApp:
 
     def refresh_apk_list(self, e):
         """Обновляет список APK файлов"""
+        # Явное обновление всегда обходит директории заново
+        self._dir_cache.clear()
         self.load_apk_files()
 
     def create_demo_files_and_refresh(self, e=None):
@@ -1194,8 +1525,17 @@ class APKAnalyzerApp:
     def show_about_page(self):
         """Показывает страницу 'О программе'"""
         self.page.controls.clear()
+        self.page.scroll = ft.ScrollMode.AUTO
+
+        # Страница полностью статична, собирается один раз
+        if 'about' not in self._page_cache:
+            self._page_cache['about'] = self._build_about_page()
+        self.page.add(self._page_cache['about'])
+        self.page.update()
 
-        content = ft.Column([
+    def _build_about_page(self):
+        """Собирает корневой элемент страницы 'О программе'"""
+        return ft.Column([
             ft.Text("О программе", size=28, weight=ft.FontWeight.BOLD),
             ft.Card(
                 content=ft.Container(
@@ -1236,9 +1576,6 @@ class APKAnalyzerApp:
             ),
         ], scroll=ft.ScrollMode.AUTO, spacing=20)
 
-        self.page.add(content)
-        self.page.update()
-
 
 def main(page: ft.Page):
     app = APKAnalyzerApp(page)
\ No newline at end of file
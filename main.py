@@ -1,18 +1,17 @@
 import flet as ft
 from interface import main as app_main
+import logging
 import threading
 import time
 import socket
 
-def is_port_open(port, host='0.0.0.0', timeout=5):
+def is_port_open(port, host='127.0.0.1', timeout=5):
     """Проверяет, открыт ли порт"""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        return result == 0
-    except:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            return sock.connect_ex((host, port)) == 0
+    except OSError:
         return False
 
 def start_metrics():
@@ -23,15 +22,12 @@ def start_metrics():
         metrics_thread = start_metrics_server(8001)
         print(f"Сервер метрик Prometheus запущен на порту 8001")
         
-        max_wait = 30
-        for i in range(max_wait):
-            if is_port_open(8001, '0.0.0.0', 1):
-                print(f"Порт 8001 успешно открыт")
-                return metrics_thread
-            print(f"Ожидание открытия порта 8001... ({i+1}/{max_wait})")
-            time.sleep(1)
-        
-        print("Предупреждение: порт 8001 не открылся вовремя")
+        # Сервер поднимается в потоке почти сразу, достаточно одной короткой проверки
+        time.sleep(0.05)
+        if is_port_open(8001, '127.0.0.1', 0.1):
+            print(f"Порт 8001 успешно открыт")
+        else:
+            print("Предупреждение: порт 8001 пока не открыт")
         return metrics_thread
         
     except Exception as e:
@@ -47,14 +43,17 @@ def start_metrics():
         return None
 
 if __name__ == "__main__":
+    # Сообщения анализатора выводятся через logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Запускаем сервер метрик в отдельном потоке
     print("=" * 60)
     print("Запуск Mobile Guard APK Analyzer")
     print("=" * 60)
     
-    metrics_thread = start_metrics()
-    
-    time.sleep(2)
+    # Метрики не обязательны для работы UI: сервер поднимается в фоне,
+    # а приложение запускается сразу, не дожидаясь его
+    threading.Thread(target=start_metrics, daemon=True).start()
     
     print("Запуск Flet приложения...")
     print(f"Приложение доступно по адресу: http://localhost:8000")
@@ -2,9 +2,17 @@ from prometheus_client import start_http_server, Counter, Histogram, Gauge, Summ
 import time
 import threading
 import os
+import signal
+import weakref
+from collections import deque
 from datetime import datetime
 import sys
-import psutil
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
 
 
 # Добавляем путь для импорта
@@ -62,26 +70,155 @@ DANGEROUS_PERMISSIONS_COUNT = Gauge(
     'Number of dangerous permissions detected in current scan'
 )
 
+# Дочерние счетчики для известных значений меток создаются один раз,
+# чтобы не искать их через labels() при каждом переносе
+_CHILDREN = {}
+for _counter, _label_values in (
+    (APK_ANALYSIS_COUNT, ('success', 'error')),
+    (APK_DETECTION_COUNT, ('low', 'medium', 'high')),
+    (REPORT_GENERATION_COUNT, ('json', 'csv', 'txt', 'html')),
+    (FILE_OPERATIONS_COUNT, ('delete', 'analysis_start', 'analysis_complete',
+                             'report_generation', 'report_delete')),
+):
+    for _label in _label_values:
+        _CHILDREN[(_counter, _label)] = _counter.labels(_label)
+
+def _child(key):
+    """Возвращает дочерний счетчик для (счетчик, метка), создавая его для новых меток"""
+    child = _CHILDREN.get(key)
+    if child is None:
+        counter, label = key
+        child = _CHILDREN[key] = counter.labels(label)
+    return child
+
+# Отложенные метрики копятся в объекте своего потока без блокировок: счетчики
+# растут монотонно, а уже перенесенная часть хранится отдельно. Фоновый поток
+# (запускается при первой записи) раз в секунду переносит разницу в Prometheus,
+# поэтому значения на /metrics отстают не больше чем на секунду. Когда поток
+# завершается, его неперенесенный остаток переходит в общий словарь.
+_PENDING_DURATIONS_MAX = 10000  # длительности сверх лимита отбрасываются (самые старые)
+
+class _ThreadPending:
+    """Отложенные метрики одного потока"""
+    __slots__ = ('counts', 'flushed', 'durations', '__weakref__')
+
+    def __init__(self):
+        self.counts = {}
+        self.flushed = {}
+        self.durations = deque(maxlen=_PENDING_DURATIONS_MAX)
+
+_pending = threading.local()
+_pending_threads = weakref.WeakSet()
+_finished_counts = {}
+_finished_durations = deque(maxlen=_PENDING_DURATIONS_MAX)
+# Блокировка нужна только при регистрации, завершении потока и переносе;
+# RLock - финализатор может сработать в потоке, который уже ее держит
+_pending_lock = threading.RLock()
+_flusher = None
+
+def _fold_finished(counts, flushed, durations):
+    """Переносит неперенесенный остаток завершившегося потока в общий словарь"""
+    with _pending_lock:
+        for key, total in counts.items():
+            delta = total - flushed.get(key, 0)
+            if delta:
+                _finished_counts[key] = _finished_counts.get(key, 0) + delta
+        _finished_durations.extend(durations)
+
+def _thread_pending():
+    """Возвращает отложенные метрики текущего потока, регистрируя их при первом вызове"""
+    holder = getattr(_pending, 'holder', None)
+    if holder is None:
+        holder = _pending.holder = _ThreadPending()
+        weakref.finalize(holder, _fold_finished, holder.counts, holder.flushed, holder.durations)
+        with _pending_lock:
+            _pending_threads.add(holder)
+        _ensure_flusher()
+    return holder
+
+def _add_pending(counter, label, count=1):
+    """Увеличивает отложенный счетчик текущего потока"""
+    counts = _thread_pending().counts
+    key = (counter, label)
+    counts[key] = counts.get(key, 0) + count
+
+def _add_pending_duration(duration):
+    """Добавляет длительность в очередь текущего потока"""
+    _thread_pending().durations.append(duration)
+
+def _drain(durations):
+    """Забирает все длительности из очереди (append и popleft у deque атомарны)"""
+    while True:
+        try:
+            yield durations.popleft()
+        except IndexError:
+            return
+
+def flush_pending_metrics():
+    """Переносит накопленные приращения в счетчики Prometheus"""
+    global _finished_counts
+    with _pending_lock:
+        holders = list(_pending_threads)
+        finished, _finished_counts = _finished_counts, {}
+        finished_durations = list(_drain(_finished_durations))
+
+    for key, count in finished.items():
+        _child(key).inc(count)
+    for duration in finished_durations:
+        APK_ANALYSIS_DURATION.observe(duration)
+
+    # Словари потоков только читаются, перенесенная часть хранится в flushed
+    for holder in holders:
+        for duration in _drain(holder.durations):
+            APK_ANALYSIS_DURATION.observe(duration)
+        flushed = holder.flushed
+        for key, total in list(holder.counts.items()):
+            delta = total - flushed.get(key, 0)
+            if delta:
+                _child(key).inc(delta)
+                flushed[key] = total
+
+def _start_pending_flusher(interval=1.0):
+    """Запускает фоновый перенос отложенных счетчиков"""
+    def flush_loop():
+        while True:
+            time.sleep(interval)
+            try:
+                flush_pending_metrics()
+            except Exception as e:
+                print(f"Error flushing metrics: {e}")
+
+    thread = threading.Thread(target=flush_loop, daemon=True)
+    thread.start()
+    return thread
+
+def _ensure_flusher():
+    """Запускает перенос отложенных метрик один раз, независимо от HTTP-сервера"""
+    global _flusher
+    with _pending_lock:
+        if _flusher is None:
+            _flusher = _start_pending_flusher()
+
 # Функции для обновления метрик
 def record_apk_analysis(status='success'):
     """Записывает факт анализа APK"""
-    APK_ANALYSIS_COUNT.labels(status=status).inc()
+    _add_pending(APK_ANALYSIS_COUNT, status)
 
-def record_apk_detection(risk_level='low'):
+def record_apk_detection(risk_level='low', count=1):
     """Записывает обнаружение APK по уровню риска"""
-    APK_DETECTION_COUNT.labels(risk_level=risk_level).inc()
+    _add_pending(APK_DETECTION_COUNT, risk_level, count)
 
 def record_analysis_duration(duration):
     """Записывает длительность анализа"""
-    APK_ANALYSIS_DURATION.observe(duration)
+    _add_pending_duration(duration)
 
 def record_report_generation(report_format='json'):
     """Записывает генерацию отчета"""
-    REPORT_GENERATION_COUNT.labels(format=report_format).inc()
+    _add_pending(REPORT_GENERATION_COUNT, report_format)
 
-def record_file_operation(operation):
+def record_file_operation(operation, count=1):
     """Записывает операцию с файлом"""
-    FILE_OPERATIONS_COUNT.labels(operation=operation).inc()
+    _add_pending(FILE_OPERATIONS_COUNT, operation, count)
 
 def update_active_users(count):
     """Обновляет количество активных пользователей"""
@@ -96,9 +233,53 @@ def update_dangerous_permissions_count(count):
     DANGEROUS_PERMISSIONS_COUNT.set(count)
 
 
+def _periodic_ticks(interval):
+    """Периодические тики по монотонным часам: время работы итерации не сдвигает расписание"""
+    if hasattr(os, 'timerfd_create'):
+        # Linux, Python 3.13+: ядро само будит поток раз в interval секунд
+        tfd = os.timerfd_create(time.CLOCK_MONOTONIC)
+        try:
+            os.timerfd_settime(tfd, initial=interval, interval=interval)
+            while True:
+                os.read(tfd, 8)
+                yield
+        finally:
+            os.close(tfd)
+    else:
+        next_tick = time.monotonic()
+        while True:
+            next_tick += interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Итерация заняла больше периода: не догоняем пропущенные тики
+                next_tick = time.monotonic()
+            yield
+
+# Последние показания psutil: повторные запросы чаще раза в 2 секунды
+# получают сохраненные значения вместо нового чтения /proc
+_PSUTIL_MIN_INTERVAL = 2.0
+_psutil_cache = {'t': None, 'cpu': 0.0, 'mem': 0.0, 'disk': 0.0}
+_psutil_lock = threading.Lock()
+
+def _sample_sys():
+    """Возвращает (CPU %, память %, диск %) не чаще раза в _PSUTIL_MIN_INTERVAL секунд"""
+    with _psutil_lock:
+        now = time.monotonic()
+        if _psutil_cache['t'] is None or now - _psutil_cache['t'] >= _PSUTIL_MIN_INTERVAL:
+            _psutil_cache['cpu'] = psutil.cpu_percent()
+            _psutil_cache['mem'] = psutil.virtual_memory().percent
+            _psutil_cache['disk'] = psutil.disk_usage('/').percent
+            _psutil_cache['t'] = now
+        return _psutil_cache['cpu'], _psutil_cache['mem'], _psutil_cache['disk']
+
 # Мониторинг использования памяти и CPU
 def start_system_metrics_monitor():
     """Мониторинг системных метрик"""
+    if not PSUTIL_AVAILABLE:
+        print("psutil not installed. System metrics monitoring disabled.")
+        return
     
     # Создаем метрики для системы
     cpu_usage = Gauge('system_cpu_usage_percent', 'CPU usage percentage')
@@ -106,28 +287,37 @@ def start_system_metrics_monitor():
     disk_usage = Gauge('system_disk_usage_percent', 'Disk usage percentage')
     
     def monitor():
+        ticks = _periodic_ticks(15)  # Обновляем каждые 15 секунд
         while True:
             try:
-                # CPU
-                cpu_usage.set(psutil.cpu_percent())
-                
-                # Memory
-                memory = psutil.virtual_memory()
-                memory_usage.set(memory.percent)
-                
-                # Disk
-                disk = psutil.disk_usage('/')
-                disk_usage.set(disk.percent)
+                cpu, memory, disk = _sample_sys()
+                cpu_usage.set(cpu)
+                memory_usage.set(memory)
+                disk_usage.set(disk)
                 
             except Exception as e:
                 print(f"Error monitoring system metrics: {e}")
             
-            time.sleep(15)  # Обновляем каждые 15 секунд
+            next(ticks)
     
     # Запускаем мониторинг в отдельном потоке
     thread = threading.Thread(target=monitor, daemon=True)
     thread.start()
 
+# Событие остановки: на POSIX основной поток ждет его, не просыпаясь периодически
+_shutdown = threading.Event()
+
+def _wait_for_shutdown():
+    """Блокирует основной поток до Ctrl+C"""
+    signal.signal(signal.SIGINT, lambda *_: _shutdown.set())
+    if sys.platform == 'win32':
+        # На Windows обработчик сигнала не вызывается, пока основной поток
+        # заблокирован в ожидании без таймаута, поэтому ждем порциями
+        while not _shutdown.wait(1.0):
+            pass
+    else:
+        _shutdown.wait()
+
 # Функция для запуска сервера метрик в отдельном потоке
 def start_metrics_server(port=8001):
     """Запускает сервер метрик Prometheus в отдельном потоке"""
@@ -135,14 +325,10 @@ def start_metrics_server(port=8001):
         try:
             start_http_server(port)
             print(f"Prometheus metrics server started on port {port}")
-            
-            try:
-                start_system_metrics_monitor()
-            except ImportError:
-                print("psutil not installed. System metrics monitoring disabled.")
+            _ensure_flusher()
+            start_system_metrics_monitor()
                 
-            while True:
-                time.sleep(60)
+            _shutdown.wait()
         except Exception as e:
             print(f"Failed to start metrics server: {e}")
     
@@ -196,19 +382,13 @@ def main():
     print("- System metrics (CPU, Memory, Disk)")
     
     # Держим основной поток активным
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("Stopping metrics server...")
+    _wait_for_shutdown()
+    print("Stopping metrics server...")
 
 if __name__ == "__main__":
     # Для отладки - запуск сервера метрик
     print("Starting metrics server in standalone mode...")
     start_metrics_server(8001)
     
-    try:
-        while True:
-            time.sleep(60)
-    except KeyboardInterrupt:
-        print("Stopping metrics server...")
\ No newline at end of file
+    _wait_for_shutdown()
+    print("Stopping metrics server...")
\ No newline at end of file
@@ -1,10 +1,72 @@
 import json
 import csv
+import io
 import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from enum import IntEnum
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import flet as ft
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+
+if TYPE_CHECKING:
+    # flet нужен только для предпросмотра в UI и импортируется в get_report_preview
+    import flet as ft
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Aho-Corasick для поиска по нескольким шаблонам (необязательная зависимость)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Общий пул потоков для записи отчетов на диск
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='report-io')
+
+
+class RiskLevel(IntEnum):
+    """Уровень риска APK: сравнивается как число, в отчет пишется подписью"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+_RISK_LABELS = {
+    RiskLevel.LOW: "низкий",
+    RiskLevel.MEDIUM: "средний",
+    RiskLevel.HIGH: "высокий",
+}
+_RISK_BY_LABEL = {label: level for level, label in _RISK_LABELS.items()}
+
+# Значения совпадают с ft.Colors, поэтому flet не нужен для составления отчета
+_RISK_COLORS = {
+    RiskLevel.LOW: "green",
+    RiskLevel.MEDIUM: "orange",
+    RiskLevel.HIGH: "red",
+}
+
+
+def _build_automaton(words: List[str]):
+    """Строит автомат Aho-Corasick; значение слова - (позиция в списке, слово)"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for i, word in enumerate(words):
+        automaton.add_word(word, (i, word))
+    automaton.make_automaton()
+    return automaton
+
+
+def _canonical_permissions(permissions: List[str]) -> List[str]:
+    """Убирает пустые и повторяющиеся разрешения, сохраняя порядок"""
+    return list(dict.fromkeys(p for p in permissions if p))
 
 
 class ReportComposer:
@@ -37,6 +99,21 @@ class ReportComposer:
             "WRITE_CONTACTS", "ACCESS_FINE_LOCATION", "ACCESS_COARSE_LOCATION",
             "RECORD_AUDIO", "CAMERA", "READ_CALL_LOG", "WRITE_CALL_LOG"
         ]
+        
+        # Ключевые слова в нижнем регистре приводим один раз
+        self._suspicious_keywords_lc = tuple(k.lower() for k in self.suspicious_keywords)
+        
+        # Одна скомпилированная альтернатива вместо перебора списков
+        self._danger_re = re.compile(
+            '|'.join(re.escape(p) for p in self.dangerous_permissions), re.IGNORECASE
+        )
+        self._suspicious_re = re.compile(
+            '|'.join(re.escape(k) for k in self.suspicious_keywords), re.IGNORECASE
+        )
+        
+        # Если доступен pyahocorasick, все шаблоны ищутся за один проход по строке
+        self._perm_ac = _build_automaton([p.lower() for p in self.dangerous_permissions])
+        self._kw_ac = _build_automaton(list(self._suspicious_keywords_lc))
 
     def compose_report(self, apk_info: Dict, analysis_data: Dict) -> Dict[str, Any]:
         """
@@ -50,6 +127,19 @@ class ReportComposer:
             Словарь с полным отчетом
         """
         try:
+            # Один раз приводим список разрешений к каноническому виду
+            analysis_data = {
+                **analysis_data,
+                'Permissions': _canonical_permissions(analysis_data.get('Permissions', []))
+            }
+            
+            # Опасные разрешения и оценку считаем один раз на отчет
+            permissions = analysis_data['Permissions']
+            intents = analysis_data.get('Intents', {})
+            dangerous_perms = self._extract_dangerous_permissions(permissions)
+            suspicious_score = self._calculate_suspicious_score(apk_info, analysis_data, dangerous_perms)
+            risk = self._risk_level(suspicious_score, len(dangerous_perms))
+            
             # Базовый отчет
             report = {
                 'metadata': {
@@ -61,23 +151,25 @@ class ReportComposer:
                     'report_version': '1.0'
                 },
                 'permissions': {
-                    'total': len(analysis_data.get('Permissions', [])),
-                    'list': analysis_data.get('Permissions', []),
-                    'dangerous': self._extract_dangerous_permissions(analysis_data.get('Permissions', []))
+                    'total': len(permissions),
+                    'list': permissions,
+                    'dangerous': dangerous_perms
                 },
-                'intents': analysis_data.get('Intents', {}),
-                'security_assessment': self._assess_security(apk_info, analysis_data),
+                'intents': intents,
+                'security_assessment': self._assess_security(
+                    apk_info, analysis_data, dangerous_perms, suspicious_score, risk
+                ),
                 'recommendations': [],
                 'statistics': {
-                    'total_permissions': len(analysis_data.get('Permissions', [])),
-                    'dangerous_permissions': len(self._extract_dangerous_permissions(analysis_data.get('Permissions', []))),
-                    'activities': len(analysis_data.get('Intents', {})),
-                    'suspicious_score': self._calculate_suspicious_score(apk_info, analysis_data)
+                    'total_permissions': len(permissions),
+                    'dangerous_permissions': len(dangerous_perms),
+                    'activities': len(intents),
+                    'suspicious_score': suspicious_score
                 }
             }
             
             # Добавляем рекомендации
-            report['recommendations'] = self._generate_recommendations(report)
+            report['recommendations'] = self._generate_recommendations(report, risk)
             
             return report
             
@@ -87,73 +179,83 @@ class ReportComposer:
 
     def _extract_dangerous_permissions(self, permissions: List[str]) -> List[str]:
         """Извлекает опасные разрешения из списка"""
-        dangerous = []
-        for perm in permissions:
-            for danger_perm in self.dangerous_permissions:
-                if danger_perm.lower() in perm.lower():
-                    dangerous.append(perm)
-                    break
-        return dangerous
-
-    def _calculate_suspicious_score(self, apk_info: Dict, analysis_data: Dict) -> int:
+        if self._perm_ac is not None:
+            perm_ac = self._perm_ac
+            return [perm for perm in permissions if next(perm_ac.iter(perm.lower()), None) is not None]
+        return [perm for perm in permissions if self._danger_re.search(perm)]
+
+    def _find_keywords(self, apk_name_lower: str) -> List[str]:
+        """Возвращает подозрительные слова из имени в порядке списка ключевых слов"""
+        if self._kw_ac is not None:
+            return [word for _, word in sorted({value for _, value in self._kw_ac.iter(apk_name_lower)})]
+        if not self._suspicious_re.search(apk_name_lower):
+            return []
+        # Ключевые слова могут перекрываться, поэтому проверяем каждое отдельно
+        return [keyword for keyword in self._suspicious_keywords_lc if keyword in apk_name_lower]
+
+    def _calculate_suspicious_score(self, apk_info: Dict, analysis_data: Dict,
+                                    dangerous_perms: Optional[List[str]] = None) -> int:
         """Вычисляет оценку подозрительности"""
         score = 0
         
         # Проверка имени файла
-        apk_name_lower = apk_info.get('name', '').lower()
-        for keyword in self.suspicious_keywords:
-            if keyword in apk_name_lower:
-                score += 1
+        score += len(self._find_keywords(apk_info.get('name', '').lower()))
                 
         # Проверка разрешений
-        permissions = analysis_data.get('Permissions', [])
-        dangerous_perms = self._extract_dangerous_permissions(permissions)
+        if dangerous_perms is None:
+            dangerous_perms = self._extract_dangerous_permissions(analysis_data.get('Permissions', []))
         score += len(dangerous_perms) * 0.5
         
         # Нормализуем оценку (0-10)
         return min(int(score * 2), 10)
 
-    def _assess_security(self, apk_info: Dict, analysis_data: Dict) -> Dict[str, Any]:
+    @staticmethod
+    def _risk_level(suspicious_score: int, dangerous_count: int) -> RiskLevel:
+        """Определяет уровень риска по оценке и числу опасных разрешений"""
+        if suspicious_score >= 7 or dangerous_count >= 3:
+            return RiskLevel.HIGH
+        if suspicious_score >= 4 or dangerous_count >= 1:
+            return RiskLevel.MEDIUM
+        return RiskLevel.LOW
+
+    def _assess_security(self, apk_info: Dict, analysis_data: Dict,
+                         dangerous_perms: Optional[List[str]] = None,
+                         suspicious_score: Optional[int] = None,
+                         risk: Optional[RiskLevel] = None) -> Dict[str, Any]:
         """Оценивает безопасность APK"""
-        permissions = analysis_data.get('Permissions', [])
-        dangerous_perms = self._extract_dangerous_permissions(permissions)
-        suspicious_score = self._calculate_suspicious_score(apk_info, analysis_data)
+        if dangerous_perms is None:
+            dangerous_perms = self._extract_dangerous_permissions(analysis_data.get('Permissions', []))
+        if suspicious_score is None:
+            suspicious_score = self._calculate_suspicious_score(apk_info, analysis_data, dangerous_perms)
         
         # Определяем уровень риска
-        if suspicious_score >= 7 or len(dangerous_perms) >= 3:
-            risk_level = "высокий"
-            risk_color = ft.Colors.RED
-        elif suspicious_score >= 4 or len(dangerous_perms) >= 1:
-            risk_level = "средний"
-            risk_color = ft.Colors.ORANGE
-        else:
-            risk_level = "низкий"
-            risk_color = ft.Colors.GREEN
+        if risk is None:
+            risk = self._risk_level(suspicious_score, len(dangerous_perms))
             
         return {
-            'risk_level': risk_level,
-            'risk_color': risk_color,
+            'risk_level': _RISK_LABELS[risk],
+            'risk_color': _RISK_COLORS[risk],
             'suspicious_score': suspicious_score,
             'dangerous_permissions_count': len(dangerous_perms),
-            'warnings': self._generate_warnings(apk_info, analysis_data)
+            'warnings': self._generate_warnings(apk_info, analysis_data, dangerous_perms)
         }
 
-    def _generate_warnings(self, apk_info: Dict, analysis_data: Dict) -> List[str]:
+    def _generate_warnings(self, apk_info: Dict, analysis_data: Dict,
+                           dangerous_perms: Optional[List[str]] = None) -> List[str]:
         """Генерирует предупреждения на основе анализа"""
         warnings = []
         permissions = analysis_data.get('Permissions', [])
         
         # Проверка опасных разрешений
-        dangerous_perms = self._extract_dangerous_permissions(permissions)
+        if dangerous_perms is None:
+            dangerous_perms = self._extract_dangerous_permissions(permissions)
         if dangerous_perms:
             warnings.append(f"Обнаружено {len(dangerous_perms)} опасных разрешений")
             
         # Проверка подозрительного имени
-        apk_name_lower = apk_info.get('name', '').lower()
-        for keyword in self.suspicious_keywords:
-            if keyword in apk_name_lower:
-                warnings.append(f"Подозрительное ключевое слово в имени: '{keyword}'")
-                break
+        keywords = self._find_keywords(apk_info.get('name', '').lower())
+        if keywords:
+            warnings.append(f"Подозрительное ключевое слово в имени: '{keywords[0]}'")
                 
         # Проверка количества разрешений
         if len(permissions) > 20:
@@ -161,12 +263,14 @@ class ReportComposer:
             
         return warnings
 
-    def _generate_recommendations(self, report: Dict) -> List[str]:
+    def _generate_recommendations(self, report: Dict, risk: Optional[RiskLevel] = None) -> List[str]:
         """Генерирует рекомендации на основе отчета"""
         recommendations = []
         security = report.get('security_assessment', {})
+        if risk is None:
+            risk = _RISK_BY_LABEL.get(security.get('risk_level'), RiskLevel.LOW)
         
-        if security.get('risk_level') == "высокий":
+        if risk >= RiskLevel.HIGH:
             recommendations.append("⚠️ НЕ УСТАНАВЛИВАТЬ! Файл выглядит подозрительно")
             recommendations.append("Проверьте APK через VirusTotal или другие антивирусы")
             
@@ -183,7 +287,8 @@ class ReportComposer:
             
         return recommendations
 
-    def save_report(self, report: Dict, apk_name: str, formats: List[str] = None) -> Dict[str, str]:
+    def save_report(self, report: Dict, apk_name: str, formats: List[str] = None,
+                    wait: bool = True) -> Dict[str, Any]:
         """
         Сохраняет отчет в указанных форматах
         
@@ -191,165 +296,195 @@ class ReportComposer:
             report: Структурированный отчет
             apk_name: Имя APK файла (без расширения)
             formats: Список форматов для сохранения ['json', 'csv', 'txt', 'html']
+            wait: Дождаться окончания записи (если False, запись идет в фоне)
             
         Returns:
-            Словарь с путями к сохраненным файлам
+            Словарь с путями к сохраненным файлам, а при wait=False -
+            словарь с futures, которые возвращают путь к файлу
         """
         if formats is None:
             formats = ['json', 'txt']
             
         saved_files = {}
         
-        # Создаем уникальное имя файла с timestamp
+        # Создаем уникальное имя файла с timestamp, общий для всех форматов
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_filename = f"{apk_name}_{timestamp}"
+        base_path = os.path.join(self.reports_dir, f"{apk_name}_{timestamp}")
         
+        # Сначала готовим содержимое всех форматов в памяти,
+        # затем записываем файлы в фоновом пуле одним вызовом write
+        buffers = {}
         for fmt in formats:
             if fmt not in self.supported_formats:
                 print(f"Формат {fmt} не поддерживается. Пропускаем...")
                 continue
                 
-            file_path = os.path.join(self.reports_dir, f"{base_filename}.{fmt}")
+            try:
+                buffers[fmt] = getattr(self, f"_render_{fmt}")(report)
+            except Exception as e:
+                print(f"Ошибка сохранения отчета в формате {fmt}: {e}")
+                
+        futures = {
+            fmt: _IO_POOL.submit(self._write_file, f"{base_path}.{fmt}", data)
+            for fmt, data in buffers.items()
+        }
+        if not wait:
+            return futures
             
+        for fmt, future in futures.items():
             try:
-                if fmt == 'json':
-                    self._save_json(report, file_path)
-                    saved_files['json'] = file_path
-                    
-                elif fmt == 'csv':
-                    self._save_csv(report, file_path)
-                    saved_files['csv'] = file_path
-                    
-                elif fmt == 'txt':
-                    self._save_txt(report, file_path)
-                    saved_files['txt'] = file_path
-                    
-                elif fmt == 'html':
-                    self._save_html(report, file_path)
-                    saved_files['html'] = file_path
-                    
+                saved_files[fmt] = future.result()
             except Exception as e:
                 print(f"Ошибка сохранения отчета в формате {fmt}: {e}")
                 
         return saved_files
 
+    @staticmethod
+    def _write_file(file_path: str, data: bytes) -> str:
+        """Записывает готовое содержимое отчета одним вызовом и возвращает путь
+
+        Запись идет во временный файл, который затем атомарно заменяет
+        отчет, поэтому при сбое не остается обрезанных файлов.
+        """
+        # Уникальный временный файл, чтобы одновременные записи в один отчет не мешали
+        # друг другу; права 0666 ограничиваются umask, как у обычного open()
+        tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with open(fd, 'wb', buffering=1 << 20) as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return file_path
+
     def _save_json(self, report: Dict, file_path: str):
         """Сохраняет отчет в JSON формате"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=4, ensure_ascii=False)
+        self._write_file(file_path, self._render_json(report))
 
     def _save_csv(self, report: Dict, file_path: str):
         """Сохраняет отчет в CSV формате"""
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Метаданные
-            writer.writerow(['Метаданные'])
-            metadata = report.get('metadata', {})
-            for key, value in metadata.items():
-                writer.writerow([key, str(value)])
-                
-            writer.writerow([])
-            
-            # Разрешения
-            writer.writerow(['Разрешения'])
-            permissions = report.get('permissions', {}).get('list', [])
-            writer.writerow(['Общее количество', len(permissions)])
-            writer.writerow(['Список разрешений'])
-            for perm in permissions:
-                writer.writerow([perm])
-                
-            writer.writerow([])
-            
-            # Оценка безопасности
-            writer.writerow(['Оценка безопасности'])
-            security = report.get('security_assessment', {})
-            for key, value in security.items():
-                if key != 'risk_color':
-                    writer.writerow([key, str(value)])
-                    
-            writer.writerow([])
-            
-            # Рекомендации
-            writer.writerow(['Рекомендации'])
-            for rec in report.get('recommendations', []):
-                writer.writerow([rec])
+        self._write_file(file_path, self._render_csv(report))
 
     def _save_txt(self, report: Dict, file_path: str):
         """Сохраняет отчет в текстовом формате"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            # Заголовок
-            f.write("=" * 60 + "\n")
-            f.write(f"ОТЧЕТ АНАЛИЗА БЕЗОПАСНОСТИ APK\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Метаданные
-            f.write("МЕТАДАННЫЕ:\n")
-            f.write("-" * 40 + "\n")
-            metadata = report.get('metadata', {})
-            for key, value in metadata.items():
-                if key != 'report_version':
-                    f.write(f"  {key}: {value}\n")
-                    
-            f.write("\n")
-            
-            # Разрешения
-            permissions = report.get('permissions', {})
-            f.write(f"РАЗРЕШЕНИЯ: {permissions.get('total', 0)} всего\n")
-            f.write("-" * 40 + "\n")
-            
-            dangerous = permissions.get('dangerous', [])
-            if dangerous:
-                f.write(f"⚠️  ОПАСНЫЕ РАЗРЕШЕНИЯ ({len(dangerous)}):\n")
-                for perm in dangerous:
-                    f.write(f"  • {perm}\n")
-                f.write("\n")
-                
-            all_perms = permissions.get('list', [])
-            f.write(f"ВСЕ РАЗРЕШЕНИЯ:\n")
-            for i, perm in enumerate(all_perms, 1):
-                f.write(f"  {i:2d}. {perm}\n")
-                
-            f.write("\n")
-            
-            # Оценка безопасности
-            security = report.get('security_assessment', {})
-            f.write(f"ОЦЕНКА БЕЗОПАСНОСТИ:\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"  Уровень риска: {security.get('risk_level', 'неизвестно')}\n")
-            f.write(f"  Оценка подозрительности: {security.get('suspicious_score', 0)}/10\n")
-            
-            warnings = security.get('warnings', [])
-            if warnings:
-                f.write(f"  Предупреждения:\n")
-                for warning in warnings:
-                    f.write(f"    ⚠ {warning}\n")
-                    
-            f.write("\n")
-            
-            # Рекомендации
-            f.write("РЕКОМЕНДАЦИИ:\n")
-            f.write("-" * 40 + "\n")
-            for rec in report.get('recommendations', []):
-                f.write(f"  • {rec}\n")
-                
-            f.write("\n")
-            
-            # Статистика
-            stats = report.get('statistics', {})
-            f.write("СТАТИСТИКА:\n")
-            f.write("-" * 40 + "\n")
-            f.write(f"  Всего разрешений: {stats.get('total_permissions', 0)}\n")
-            f.write(f"  Опасных разрешений: {stats.get('dangerous_permissions', 0)}\n")
-            f.write(f"  Активностей: {stats.get('activities', 0)}\n")
-            
-            f.write("\n" + "=" * 60 + "\n")
-            f.write(f"Отчет сгенерирован: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n")
+        self._write_file(file_path, self._render_txt(report))
 
     def _save_html(self, report: Dict, file_path: str):
         """Сохраняет отчет в HTML формате (упрощенный)"""
-        html_content = f"""
+        self._write_file(file_path, self._render_html(report))
+
+    def _render_json(self, report: Dict) -> bytes:
+        """Формирует отчет в JSON формате"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(report, indent=4, ensure_ascii=False).encode('utf-8')
+
+    def _render_csv(self, report: Dict) -> bytes:
+        """Формирует отчет в CSV формате"""
+        rows = []
+        
+        # Метаданные
+        rows.append(['Метаданные'])
+        metadata = report.get('metadata', {})
+        rows.extend([key, str(value)] for key, value in metadata.items())
+        rows.append([])
+        
+        # Разрешения
+        rows.append(['Разрешения'])
+        permissions = report.get('permissions', {}).get('list', [])
+        rows.append(['Общее количество', len(permissions)])
+        rows.append(['Список разрешений'])
+        rows.extend([perm] for perm in permissions)
+        rows.append([])
+        
+        # Оценка безопасности
+        rows.append(['Оценка безопасности'])
+        security = report.get('security_assessment', {})
+        rows.extend([key, str(value)] for key, value in security.items() if key != 'risk_color')
+        rows.append([])
+        
+        # Рекомендации
+        rows.append(['Рекомендации'])
+        rows.extend([rec] for rec in report.get('recommendations', []))
+        
+        with io.StringIO(newline='') as f:
+            csv.writer(f).writerows(rows)
+            return f.getvalue().encode('utf-8')
+
+    def _render_txt(self, report: Dict) -> bytes:
+        """Формирует отчет в текстовом формате"""
+        lines = []
+        
+        # Заголовок
+        lines.append("=" * 60 + "\n")
+        lines.append("ОТЧЕТ АНАЛИЗА БЕЗОПАСНОСТИ APK\n")
+        lines.append("=" * 60 + "\n\n")
+        
+        # Метаданные
+        lines.append("МЕТАДАННЫЕ:\n")
+        lines.append("-" * 40 + "\n")
+        metadata = report.get('metadata', {})
+        lines.extend(f"  {key}: {value}\n" for key, value in metadata.items() if key != 'report_version')
+        lines.append("\n")
+        
+        # Разрешения
+        permissions = report.get('permissions', {})
+        lines.append(f"РАЗРЕШЕНИЯ: {permissions.get('total', 0)} всего\n")
+        lines.append("-" * 40 + "\n")
+        
+        dangerous = permissions.get('dangerous', [])
+        if dangerous:
+            lines.append(f"⚠️  ОПАСНЫЕ РАЗРЕШЕНИЯ ({len(dangerous)}):\n")
+            lines.extend(f"  • {perm}\n" for perm in dangerous)
+            lines.append("\n")
+            
+        all_perms = permissions.get('list', [])
+        lines.append("ВСЕ РАЗРЕШЕНИЯ:\n")
+        lines.extend(f"  {i:2d}. {perm}\n" for i, perm in enumerate(all_perms, 1))
+        lines.append("\n")
+        
+        # Оценка безопасности
+        security = report.get('security_assessment', {})
+        lines.append("ОЦЕНКА БЕЗОПАСНОСТИ:\n")
+        lines.append("-" * 40 + "\n")
+        lines.append(f"  Уровень риска: {security.get('risk_level', 'неизвестно')}\n")
+        lines.append(f"  Оценка подозрительности: {security.get('suspicious_score', 0)}/10\n")
+        
+        warnings = security.get('warnings', [])
+        if warnings:
+            lines.append("  Предупреждения:\n")
+            lines.extend(f"    ⚠ {warning}\n" for warning in warnings)
+            
+        lines.append("\n")
+        
+        # Рекомендации
+        lines.append("РЕКОМЕНДАЦИИ:\n")
+        lines.append("-" * 40 + "\n")
+        lines.extend(f"  • {rec}\n" for rec in report.get('recommendations', []))
+        lines.append("\n")
+        
+        # Статистика
+        stats = report.get('statistics', {})
+        lines.append("СТАТИСТИКА:\n")
+        lines.append("-" * 40 + "\n")
+        lines.append(f"  Всего разрешений: {stats.get('total_permissions', 0)}\n")
+        lines.append(f"  Опасных разрешений: {stats.get('dangerous_permissions', 0)}\n")
+        lines.append(f"  Активностей: {stats.get('activities', 0)}\n")
+        
+        lines.append("\n" + "=" * 60 + "\n")
+        lines.append(f"Отчет сгенерирован: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        lines.append("=" * 60 + "\n")
+        
+        return "".join(lines).encode('utf-8')
+
+    def _render_html(self, report: Dict) -> bytes:
+        """Формирует отчет в HTML формате (упрощенный)"""
+        parts = [f"""
         <!DOCTYPE html>
         <html lang="ru">
         <head>
@@ -387,29 +522,29 @@ class ReportComposer:
             <div class="section">
                 <h2>Разрешения ({report.get('permissions', {}).get('total', 0)})</h2>
                 <ul>
-        """
+        """]
         
-        # Добавляем разрешения
-        for perm in report.get('permissions', {}).get('list', []):
-            is_dangerous = any(danger_perm.lower() in perm.lower() 
-                             for danger_perm in self.dangerous_permissions)
-            danger_class = 'dangerous' if is_dangerous else ''
-            html_content += f'<li class="{danger_class}">{perm}</li>\n'
+        # Добавляем разрешения, опасные уже найдены при составлении отчета
+        permissions = report.get('permissions', {})
+        dangerous_set = frozenset(permissions.get('dangerous', []))
+        parts.extend(
+            f'<li class="{"dangerous" if perm in dangerous_set else ""}">{perm}</li>\n'
+            for perm in permissions.get('list', [])
+        )
             
-        html_content += """
+        parts.append("""
                 </ul>
             </div>
             
             <div class="section">
                 <h2>Рекомендации</h2>
                 <ul>
-        """
+        """)
         
         # Добавляем рекомендации
-        for rec in report.get('recommendations', []):
-            html_content += f'<li>{rec}</li>\n'
+        parts.extend(f'<li>{rec}</li>\n' for rec in report.get('recommendations', []))
             
-        html_content += """
+        parts.append("""
                 </ul>
             </div>
             
@@ -418,12 +553,11 @@ class ReportComposer:
             </div>
         </body>
         </html>
-        """
+        """)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        return "".join(parts).encode('utf-8')
 
-    def get_report_preview(self, report: Dict) -> ft.Column:
+    def get_report_preview(self, report: Dict) -> "ft.Column":
         """
         Создает предварительный просмотр отчета для Flet UI
         
@@ -433,6 +567,8 @@ class ReportComposer:
         Returns:
             ft.Column с элементами предпросмотра
         """
+        import flet as ft
+        
         security = report.get('security_assessment', {})
         permissions = report.get('permissions', {})
         
@@ -482,16 +618,27 @@ class ReportComposer:
         ], spacing=10)
 
 
+# Общий компоновщик для функций обратной совместимости
+_DEFAULT_COMPOSER = None
+
+
+def _default_composer() -> ReportComposer:
+    """Возвращает общий ReportComposer, создавая его при первом вызове"""
+    global _DEFAULT_COMPOSER
+    if _DEFAULT_COMPOSER is None:
+        _DEFAULT_COMPOSER = ReportComposer()
+    return _DEFAULT_COMPOSER
+
+
 # Функции для обратной совместимости
 def save_to_json(data, output_file):
     """Сохраняет данные в JSON файл"""
-    composer = ReportComposer()
-    return composer._save_json(data, output_file)
+    return _default_composer()._save_json(data, output_file)
 
 
 def save_to_csv(data, output_file):
     """Сохраняет данные в CSV файл"""
-    composer = ReportComposer()
+    composer = _default_composer()
     
     if isinstance(data, list) and len(data) > 0:
         report = composer.compose_report(